@@ -46,7 +46,7 @@ class ADKHostManager(ApplicationManager):
   _messages: list[Message]
   _tasks: list[Task]
   _events: dict[str, Event]
-  _pending_message_ids: list[str]
+  _pending_message_ids: dict[str, None]
   _agents: list[AgentCard]
   _task_map: dict[str, str]
 
@@ -55,7 +55,8 @@ class ADKHostManager(ApplicationManager):
     self._messages = []
     self._tasks = []
     self._events = {}
-    self._pending_message_ids = []
+    # Insertion-ordered so pending messages are reported in arrival order
+    self._pending_message_ids = {}
     self._agents = []
     self._artifact_chunks = {}
     self._session_service = InMemorySessionService()
@@ -108,7 +109,7 @@ class ADKHostManager(ApplicationManager):
     self._messages.append(message)
     message_id = get_message_id(message)
     if message_id:
-      self._pending_message_ids.append(message_id)
+      self._pending_message_ids[message_id] = None
     conversation_id = (
         message.metadata['conversation_id']
         if 'conversation_id' in message.metadata
@@ -183,7 +184,7 @@ class ADKHostManager(ApplicationManager):
 
     if conversation:
       conversation.messages.append(response)
-    self._pending_message_ids.remove(message_id)
+    self._pending_message_ids.pop(message_id, None)
 
   def add_task(self, task: Task):
     self._tasks.append(task)
@@ -304,7 +305,7 @@ class ADKHostManager(ApplicationManager):
 
   def get_pending_messages(self) -> list[Tuple[str, str]]:
     rval = []
-    for message_id in self._pending_message_ids:
+    for message_id in list(self._pending_message_ids):
       if message_id in self._task_map:
         task_id = self._task_map[message_id]
         task = next(filter(lambda x: x.id == task_id, self._tasks), None)
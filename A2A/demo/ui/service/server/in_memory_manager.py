@@ -1,6 +1,8 @@
 import asyncio
-import datetime
-from typing import Tuple, Optional
+import collections
+import itertools
+import time
+from typing import Iterator, Tuple, Optional
 import uuid
 from service.types import Conversation, Event
 from common.types import (
@@ -24,26 +26,38 @@ class InMemoryFakeAgentManager(ApplicationManager):
   uses to send messages to the agent and provide information for the frontend.
   """
   _conversations: list[Conversation]
+  _conversations_by_id: dict[str, Conversation]
   _messages: list[Message]
-  _tasks: list[Task]
+  _tasks: dict[str, Task]
   _events: list[Event]
-  _pending_message_ids: list[str]
-  _next_message_idx: int
+  _event_queue: collections.deque
+  _pending_message_ids: dict[str, None]
+  _message_cycle: Iterator[Tuple[int, Message]]
   _agents: list[AgentCard]
 
   def __init__(self):
     self._conversations = []
+    # Index of conversation id to conversation, kept in sync with the list
+    self._conversations_by_id = {}
     self._messages = []
-    self._tasks = []
+    # Map of task id to task
+    self._tasks = {}
     self._events = []
-    self._pending_message_ids = []
-    self._next_message_idx = 0
+    # Events are queued on the request path and drained into _events in
+    # batches when they are read. Each message is processed on its own
+    # thread and event loop, so this is a deque, whose appends and pops are
+    # thread-safe, rather than a loop-bound asyncio.Queue.
+    self._event_queue = collections.deque()
+    # Insertion-ordered so pending messages are reported in arrival order
+    self._pending_message_ids = {}
+    self._message_cycle = itertools.cycle(enumerate(_message_queue))
     self._agents = []
 
   def create_conversation(self) -> Conversation:
     conversation_id = str(uuid.uuid4())
     c = Conversation(conversation_id=conversation_id, is_active=True)
     self._conversations.append(c)
+    self._conversations_by_id[conversation_id] = c
     return c
 
   def sanitize_message(self, message: Message) -> Message:
@@ -54,27 +68,26 @@ class InMemoryFakeAgentManager(ApplicationManager):
 
   async def process_message(self, message: Message):
     self._messages.append(message)
-    self._pending_message_ids.append(message.metadata['message_id'])
-    conversation_id = (
-        message.metadata['conversation_id']
-        if 'conversation_id' in message.metadata
-        else None
-    )
+    metadata = message.metadata
+    message_id = metadata['message_id']
+    conversation_id = metadata.get('conversation_id')
+    self._pending_message_ids[message_id] = None
     # Now check the conversation and attach the message id.
     conversation = self.get_conversation(conversation_id)
     if conversation:
       conversation.messages.append(message)
-    self._events.append(Event(
+    self._enqueue_event(Event(
         id=str(uuid.uuid4()),
         actor="host",
         content=message,
-        timestamp=datetime.datetime.utcnow().timestamp(),
+        timestamp=time.time(),
     ))
     # Now actually process the message. If the response is async, return None
     # for the message response and the updated message information for the
     # incoming message (with ids attached).
     task_id = str(uuid.uuid4())
-    if self._next_message_idx != 0:
+    message_idx, response = self.next_message()
+    if message_idx != 0:
       self.add_task(
           Task(
               id=task_id,
@@ -85,41 +98,49 @@ class InMemoryFakeAgentManager(ApplicationManager):
               ),
           )
       )
-    await asyncio.sleep(self._next_message_idx)
-    response = self.next_message()
-    response.metadata = {**message.metadata, **{'message_id': str(uuid.uuid4())}}
+    await asyncio.sleep(message_idx)
+    response.metadata = dict(metadata)
+    response.metadata['message_id'] = str(uuid.uuid4())
     if conversation:
       conversation.messages.append(response)
-    self._events.append(Event(
+    self._enqueue_event(Event(
         id=str(uuid.uuid4()),
         actor="host",
         content=response,
-        timestamp=datetime.datetime.utcnow().timestamp(),
+        timestamp=time.time(),
     ))
-    self._pending_message_ids.remove(message.metadata['message_id'])
+    self._pending_message_ids.pop(message_id, None)
     # Now clean up the task
-    task = next(filter(lambda x: x.id == task_id, self.tasks), None)
+    task = self._tasks.get(task_id)
     if task:
       task.status.state = TaskState.COMPLETED
       task.artifacts = [Artifact(name="response", parts=response.parts)]
       self.update_task(task)
 
   def add_task(self, task: Task):
-    self._tasks.append(task)
+    self._tasks[task.id] = task
 
   def update_task(self, task: Task):
-    for i, t in enumerate(self._tasks):
-      if t.id == task.id:
-        self._tasks[i] = task
-        return
+    if task.id in self._tasks:
+      self._tasks[task.id] = task
 
   def add_event(self, event: Event):
     self._events.append(event)
 
-  def next_message(self) -> Message:
-    message = _message_queue[self._next_message_idx]
-    self._next_message_idx = (self._next_message_idx + 1) % len(_message_queue)
-    return message
+  def _enqueue_event(self, event: Event):
+    self._event_queue.append(event)
+
+  def _flush_events(self):
+    batch = []
+    while True:
+      try:
+        batch.append(self._event_queue.popleft())
+      except IndexError:
+        break
+    self._events.extend(batch)
+
+  def next_message(self) -> Tuple[int, Message]:
+    return next(self._message_cycle)
 
   def get_conversation(
       self,
@@ -127,12 +148,10 @@ class InMemoryFakeAgentManager(ApplicationManager):
   ) -> Optional[Conversation]:
     if not conversation_id:
       return None
-    return next(
-        filter(lambda c: c.conversation_id == conversation_id,
-               self._conversations), None)
+    return self._conversations_by_id.get(conversation_id)
 
   def get_pending_messages(self) -> list[str]:
-    return self._pending_message_ids
+    return list(self._pending_message_ids)
 
   def register_agent(self, url):
     agent_data = get_agent_card(url)
@@ -150,15 +169,17 @@ class InMemoryFakeAgentManager(ApplicationManager):
 
   @property
   def tasks(self) -> list[Task]:
-    return self._tasks
+    return list(self._tasks.values())
 
   @property
   def events(self) -> list[Event]:
+    # Pick up everything queued since the last read.
+    self._flush_events()
     return self._events
 
 # This represents the precanned responses that will be returned in order.
-# Extend this list to test more functionality of the UI
-_message_queue: list[Message] = [
+# Extend this tuple to test more functionality of the UI
+_message_queue: tuple[Message, ...] = (
     Message(role="agent", parts=[TextPart(text="Hello")]),
     Message(role="agent", parts=[
         DataPart(
@@ -190,4 +211,4 @@ _message_queue: list[Message] = [
     ]),
     Message(role="agent", parts=[TextPart(text="I like cats")]),
     Message(role="agent", parts=[TextPart(text="And I like dogs")]),
-]
+)
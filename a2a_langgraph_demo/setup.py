@@ -18,7 +18,7 @@ setup(
         "langchain-core>=0.1.0",
         "langgraph>=0.0.20",
         "fastapi>=0.104.1",
-        "uvicorn>=0.24.0",
+        "uvicorn[standard]>=0.24.0",
         "python-dotenv>=1.0.0",
         "pydantic>=2.4.2",
         "openai>=1.3.0",
@@ -26,10 +26,17 @@ setup(
         "requests>=2.31.0",
         "sse-starlette>=1.6.5",
         "python-multipart>=0.0.6",
-        "sseclient-py>=1.7.2",
-        "sentry-sdk>=1.40.0"
+        "sentry-sdk>=1.40.0",
+        "orjson>=3.9.0",
+        "cachetools>=5.3.0",
+        "numpy>=1.24.0",
+        "httpx[http2]>=0.25.0"
     ],
-    python_requires=">=3.9",
+    extras_require={
+        "redis": ["redis>=5.0.0"],
+        "test": ["pytest>=8.0.0"],
+    },
+    python_requires=">=3.10",
     entry_points={
         "console_scripts": [
             "a2a-server=a2a_langgraph_demo.main:main",
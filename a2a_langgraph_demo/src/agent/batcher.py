@@ -0,0 +1,122 @@
+"""
+Request batching for LLM calls made by the LangGraph agent.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.runnables import Runnable
+
+
+class LLMBatcher:
+    """Coalesce concurrent LLM requests into a single call.
+
+    Requests with the same key (the session they come from) submitted within
+    `max_wait_ms` of each other, up to `max_batch_size` of them, are sent to
+    `batch_chain` as one numbered list. Requests are never batched across
+    keys, so one user's text can't influence the results of another's.
+    A lone request goes to `chain` as usual. If the batched reply does not
+    contain exactly one result per input, the batch is retried item by item
+    with `chain`.
+    """
+
+    def __init__(
+        self,
+        chain: Runnable,
+        batch_chain: Runnable,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            chain: Runnable taking {"input": str} for a single request.
+            batch_chain: Runnable taking {"inputs": str} with the numbered
+                requests and returning an object with a `results` list.
+            max_batch_size: Maximum number of requests per LLM call.
+            max_wait_ms: How long to wait for more requests once one arrives.
+        """
+        self.chain = chain
+        self.batch_chain = batch_chain
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Batches being dispatched, referenced until they finish so they
+        # aren't garbage-collected mid-flight
+        self._dispatching: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str, key: Any = None) -> Any:
+        """Queue a request and wait for its result.
+
+        Args:
+            text: The request text.
+            key: Only requests with the same key are batched together; a
+                request without one is always sent on its own.
+        """
+        # The queue and worker belong to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect(self._queue))
+
+        future = loop.create_future()
+        self._queue.put_nowait((key if key is not None else object(), text, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        """Gather queued requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[Any, List[Tuple[str, asyncio.Future]]] = {}
+            for key, text, future in batch:
+                groups.setdefault(key, []).append((text, future))
+
+            # Dispatch without waiting so the next batch can start filling
+            for group in groups.values():
+                task = asyncio.create_task(self._dispatch(group))
+                self._dispatching.add(task)
+                task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Run one LLM call for the batch and resolve each request's future."""
+        texts = [text for text, _ in batch]
+        try:
+            results = await self._run(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self, texts: List[str]) -> List[Any]:
+        if len(texts) == 1:
+            return [await self.chain.ainvoke({"input": texts[0]})]
+
+        numbered = "\n".join(f"{i}. {text}" for i, text in enumerate(texts, 1))
+        response = await self.batch_chain.ainvoke({"inputs": numbered})
+        results = getattr(response, "results", None)
+        if results is not None and len(results) == len(texts):
+            return results
+
+        # The model did not answer every input; fall back to one call each
+        return await self.chain.abatch([{"input": text} for text in texts])
@@ -2,20 +2,23 @@
 LangGraph implementation of the agent.
 """
 
+import asyncio
+import functools
 import os
+import re
 from typing import Dict, List, Tuple, Optional, Any, Union, Annotated
 from dotenv import load_dotenv
-import json
+import orjson
 
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.schema import AIMessage, HumanMessage
-from langchain.tools import tool
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import BaseMessage
+from pydantic import BaseModel, Field, ValidationError
 
 from langgraph.graph import StateGraph, END
 
+from .batcher import LLMBatcher
 from .tool_executor import ToolExecutor
 
 from .state import AgentState
@@ -24,20 +27,29 @@ from .tools import convert_currency, get_weather
 # Load environment variables
 load_dotenv()
 
-# Initialize LLM
+# Initialize LLM, importing only the provider that will be used
 if os.getenv("OPENAI_API_KEY"):
+    from langchain_openai import ChatOpenAI
     llm = ChatOpenAI(model="gpt-3.5-turbo-0125", temperature=0)
 elif os.getenv("GOOGLE_API_KEY"):
+    from langchain_google_genai import ChatGoogleGenerativeAI
     llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro", temperature=0)
 else:
     raise ValueError("No API key found. Please set OPENAI_API_KEY or GOOGLE_API_KEY in .env file.")
 
 
+# Cache formatted conversions so repeated queries in a session skip the tool.
+# Weather readings are cached by the weather service itself.
+@functools.lru_cache(maxsize=1024)
+def _cached_convert(amount: float, from_currency: str, to_currency: str) -> str:
+    return convert_currency(amount, from_currency, to_currency)
+
+
 # Define tools
 @tool
 def currency_conversion(amount: float, from_currency: str, to_currency: str) -> str:
     """Convert an amount from one currency to another."""
-    return convert_currency(amount, from_currency, to_currency)
+    return _cached_convert(amount, from_currency, to_currency)
 
 
 @tool
@@ -51,8 +63,125 @@ tools = [currency_conversion, weather_information]
 tool_executor = ToolExecutor(tools)
 
 
+class ExtractedParams(BaseModel):
+    """Parameters extracted from a user query."""
+    task_type: Optional[str] = Field(None, description="currency_conversion or weather_information")
+    amount: Optional[float] = Field(None, description="The amount to convert")
+    from_currency: Optional[str] = Field(None, description="The source currency code")
+    to_currency: Optional[str] = Field(None, description="The target currency code")
+    location: Optional[str] = Field(None, description="The location for weather information")
+    date: Optional[str] = Field(None, description="The date for weather information (YYYY-MM-DD)")
+
+
+class ExtractedParamsBatch(BaseModel):
+    """Parameters extracted from a numbered list of user queries."""
+    results: List[ExtractedParams] = Field(description="One entry per query, in the same order")
+
+
+# Prompts and chains are built once at import and reused by every node call.
+# Structured output uses function calling explicitly; gpt-3.5-turbo doesn't
+# support json_schema, and LangChain warns at import when falling back to it.
+_PARSE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an AI assistant that extracts parameters from user queries.
+    Extract the following parameters if present:
+    - task_type: The type of task (currency_conversion or weather_information)
+    - amount: The amount to convert (for currency conversion)
+    - from_currency: The source currency (for currency conversion)
+    - to_currency: The target currency (for currency conversion)
+    - location: The location (for weather information)
+    - date: The date (for weather information)
+
+    If a parameter is not present, leave it unset.
+    """),
+    ("user", "{input}")
+])
+_EXTRACT_CHAIN = _PARSE_PROMPT | llm.with_structured_output(ExtractedParams, method="function_calling")
+
+_BATCH_PARSE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an AI assistant that extracts parameters from user queries.
+    You will receive a numbered list of independent queries. For each query, in order,
+    extract the following parameters if present:
+    - task_type: The type of task (currency_conversion or weather_information)
+    - amount: The amount to convert (for currency conversion)
+    - from_currency: The source currency (for currency conversion)
+    - to_currency: The target currency (for currency conversion)
+    - location: The location (for weather information)
+    - date: The date (for weather information)
+
+    Return exactly one result per query. If a parameter is not present, leave it unset.
+    """),
+    ("user", "{inputs}")
+])
+_BATCH_EXTRACT_CHAIN = _BATCH_PARSE_PROMPT | llm.with_structured_output(ExtractedParamsBatch, method="function_calling")
+
+# Concurrent parse_input calls from the same session share one LLM call
+extract_batcher = LLMBatcher(chain=_EXTRACT_CHAIN, batch_chain=_BATCH_EXTRACT_CHAIN)
+
+_UNKNOWN_TASK_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an AI assistant that helps users with currency conversion and weather information.
+    Based on the user's message, determine if they want:
+    1. Currency conversion (task_type: currency_conversion)
+    2. Weather information (task_type: weather_information)
+    3. Something else (task_type: unknown)
+
+    Return your determination as a JSON object with a task_type field.
+    """),
+    MessagesPlaceholder(variable_name="messages"),
+])
+_UNKNOWN_TASK_CHAIN = _UNKNOWN_TASK_PROMPT | llm
+
+_MISSING_PARAMS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an AI assistant that helps users with currency conversion.
+    The user wants to convert currency, but some parameters are missing.
+    Ask for the missing parameters in a conversational way.
+
+    Missing parameters: {missing_params}
+    Current parameters: {current_params}
+    """),
+    MessagesPlaceholder(variable_name="messages"),
+])
+_MISSING_PARAMS_CHAIN = _MISSING_PARAMS_PROMPT | llm
+
+
+# Deterministic patterns for the common phrasings; anything else goes to the LLM
+_CURRENCY_RE = re.compile(
+    r"convert\s+(?P<amount>\d+(?:\.\d+)?)\s+(?P<from_currency>[a-z]{3})"
+    r"\s+(?:to|in|into)\s+(?P<to_currency>[a-z]{3})\s*[?.!]?",
+    re.IGNORECASE,
+)
+_WEATHER_RE = re.compile(
+    r"(?!.*\b(?:today|tonight|tomorrow|next|this|on)\b)"
+    r"(?:what(?:'s| is) the )?weather(?: like)?\s+(?:in|for|at)\s+"
+    r"(?P<location>[a-z][a-z .'-]*?)\s*[?.!]?",
+    re.IGNORECASE,
+)
+
+
+def fast_parse(user_message: str) -> Optional[Dict[str, Any]]:
+    """Extract parameters from simple queries without calling the LLM."""
+    text = user_message.strip()
+
+    match = _CURRENCY_RE.fullmatch(text)
+    if match:
+        return {
+            "task_type": "currency_conversion",
+            "amount": float(match["amount"]),
+            "from_currency": match["from_currency"].upper(),
+            "to_currency": match["to_currency"].upper(),
+        }
+
+    match = _WEATHER_RE.fullmatch(text)
+    if match:
+        return {
+            "task_type": "weather_information",
+            "location": match["location"],
+        }
+
+    return None
+
+
 # Define graph nodes
-def parse_input(state: AgentState) -> AgentState:
+async def parse_input(state: AgentState) -> AgentState:
     """Parse the user input and extract parameters."""
     # Get the last user message
     user_message = state.get_last_user_message()
@@ -64,116 +193,105 @@ def parse_input(state: AgentState) -> AgentState:
     state.task_state = "working"
     state.add_intermediate_response("Analyzing your request...")
 
-    # Create a prompt to extract parameters
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an AI assistant that extracts parameters from user queries.
-        Extract the following parameters if present:
-        - task_type: The type of task (currency_conversion or weather_information)
-        - amount: The amount to convert (for currency conversion)
-        - from_currency: The source currency (for currency conversion)
-        - to_currency: The target currency (for currency conversion)
-        - location: The location (for weather information)
-        - date: The date (for weather information)
-
-        Return the parameters as a JSON object. If a parameter is not present, do not include it.
-        """),
-        ("user", "{input}")
-    ])
-
-    # Extract parameters
-    chain = prompt | llm
-    response = chain.invoke({"input": user_message})
+    # Skip the LLM entirely when the query matches a known phrasing
+    parameters = fast_parse(user_message)
+    if parameters is not None:
+        state.parameters.update(parameters)
+        _prefetch_tool_call(state)
+        return state
 
+    # Extract parameters; the model is constrained to the ExtractedParams schema
     try:
-        # Try to parse the response as JSON
-        parameters = json.loads(response.content)
-        state.parameters.update(parameters)
-    except (json.JSONDecodeError, AttributeError):
-        # If parsing fails, use a more direct approach
-        state.add_intermediate_response("Analyzing your request further...")
-
-        # Create a more structured prompt
-        structured_prompt = ChatPromptTemplate.from_messages([
-            ("system", """Extract parameters from the user query and return them in this exact JSON format:
-            {
-                "task_type": "currency_conversion OR weather_information",
-                "amount": number (for currency conversion),
-                "from_currency": "currency code" (for currency conversion),
-                "to_currency": "currency code" (for currency conversion),
-                "location": "city name" (for weather information),
-                "date": "YYYY-MM-DD" (for weather information, optional)
-            }
-
-            Only include parameters that are present in the query. Return valid JSON.
-            """),
-            ("user", "{input}")
-        ])
-
-        chain = structured_prompt | llm
-        response = chain.invoke({"input": user_message})
+        params = await extract_batcher.submit(user_message, state.context.get("session_id"))
+    except (OutputParserException, ValidationError):
+        params = None
 
-        try:
-            parameters = json.loads(response.content)
-            state.parameters.update(parameters)
-        except (json.JSONDecodeError, AttributeError):
-            state.set_error("Failed to parse parameters from user input")
-            return state
+    if params is None:
+        state.set_error("Failed to parse parameters from user input")
+        return state
 
+    state.parameters.update(params.model_dump(exclude_none=True))
+    _prefetch_tool_call(state)
     return state
 
 
-def check_parameters(state: AgentState) -> Dict[str, str]:
-    """Check if all required parameters are present."""
+def _tool_input(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the tool executor input for a task whose parameters are complete."""
+    if parameters.get("task_type") == "currency_conversion":
+        return {
+            "tool_name": "currency_conversion",
+            "amount": float(parameters.get("amount")),
+            "from_currency": parameters.get("from_currency"),
+            "to_currency": parameters.get("to_currency")
+        }
+    return {
+        "tool_name": "weather_information",
+        "location": parameters.get("location"),
+        "date": parameters.get("date")
+    }
+
+
+def _prefetch_tool_call(state: AgentState) -> None:
+    """Start the tool call as soon as the parameters are known to be complete.
+
+    The call then runs while the graph routes to execute_task and the
+    parse_input update is streamed to the client.
+    """
+    if check_parameters(state) != "complete_parameters":
+        return
+    try:
+        tool_input = _tool_input(state.parameters)
+    except (TypeError, ValueError):
+        # Leave it to execute_task to report bad parameters
+        return
+    state.pending_tool_call = asyncio.create_task(tool_executor.ainvoke(tool_input))
+
+
+async def _call_tool(state: AgentState) -> str:
+    """Return the result of the prefetched tool call, or make the call now."""
+    pending, state.pending_tool_call = state.pending_tool_call, None
+    if pending is not None:
+        return await pending
+    return await tool_executor.ainvoke(_tool_input(state.parameters))
+
+
+def check_parameters(state: AgentState) -> str:
+    """Route to the next node based on which required parameters are present."""
     task_type = state.parameters.get("task_type")
 
     if not task_type:
-        return {"next": "unknown_task"}
+        return "unknown_task"
 
     if task_type == "currency_conversion":
         required_params = ["amount", "from_currency", "to_currency"]
         missing_params = [p for p in required_params if p not in state.parameters]
 
         if missing_params:
-            return {"next": "missing_parameters"}
+            return "missing_parameters"
         else:
-            return {"next": "complete_parameters"}
+            return "complete_parameters"
 
     elif task_type == "weather_information":
         if "location" not in state.parameters:
-            return {"next": "missing_parameters"}
+            return "missing_parameters"
         else:
-            return {"next": "complete_parameters"}
+            return "complete_parameters"
 
-    return {"next": "unknown_task"}
+    return "unknown_task"
 
 
-def handle_unknown_task(state: AgentState) -> AgentState:
+async def handle_unknown_task(state: AgentState) -> AgentState:
     """Handle unknown task types."""
-    # Create a prompt to determine the task type
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an AI assistant that helps users with currency conversion and weather information.
-        Based on the user's message, determine if they want:
-        1. Currency conversion (task_type: currency_conversion)
-        2. Weather information (task_type: weather_information)
-        3. Something else (task_type: unknown)
-
-        Return your determination as a JSON object with a task_type field.
-        """),
-        MessagesPlaceholder(variable_name="messages"),
-    ])
-
     # Get conversation history
-    messages = [HumanMessage(content=msg.content) if msg.role == "user" else AIMessage(content=msg.content)
-                for msg in state.messages]
+    messages = state.lc_messages
 
     # Determine task type
-    chain = prompt | llm
-    response = chain.invoke({"messages": messages})
+    response = await _UNKNOWN_TASK_CHAIN.ainvoke({"messages": messages})
 
     try:
-        result = json.loads(response.content)
+        result = orjson.loads(response.content)
         state.parameters["task_type"] = result.get("task_type", "unknown")
-    except (json.JSONDecodeError, AttributeError):
+    except (orjson.JSONDecodeError, AttributeError):
         state.parameters["task_type"] = "unknown"
 
     if state.parameters["task_type"] == "unknown":
@@ -185,7 +303,7 @@ def handle_unknown_task(state: AgentState) -> AgentState:
     return state
 
 
-def request_missing_parameters(state: AgentState) -> AgentState:
+async def request_missing_parameters(state: AgentState) -> AgentState:
     """Request missing parameters from the user."""
     task_type = state.parameters.get("task_type")
 
@@ -193,25 +311,11 @@ def request_missing_parameters(state: AgentState) -> AgentState:
         required_params = ["amount", "from_currency", "to_currency"]
         missing_params = [p for p in required_params if p not in state.parameters]
 
-        # Create a prompt to ask for missing parameters
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an AI assistant that helps users with currency conversion.
-            The user wants to convert currency, but some parameters are missing.
-            Ask for the missing parameters in a conversational way.
-
-            Missing parameters: {missing_params}
-            Current parameters: {current_params}
-            """),
-            MessagesPlaceholder(variable_name="messages"),
-        ])
-
         # Get conversation history
-        messages = [HumanMessage(content=msg.content) if msg.role == "user" else AIMessage(content=msg.content)
-                    for msg in state.messages]
+        messages = state.lc_messages
 
         # Generate response
-        chain = prompt | llm
-        response = chain.invoke({
+        response = await _MISSING_PARAMS_CHAIN.ainvoke({
             "messages": messages,
             "missing_params": missing_params,
             "current_params": {k: v for k, v in state.parameters.items() if k in required_params}
@@ -230,7 +334,7 @@ def request_missing_parameters(state: AgentState) -> AgentState:
     return state
 
 
-def execute_task(state: AgentState) -> AgentState:
+async def execute_task(state: AgentState) -> AgentState:
     """Execute the task with the given parameters."""
     task_type = state.parameters.get("task_type")
 
@@ -240,13 +344,8 @@ def execute_task(state: AgentState) -> AgentState:
             from_currency = state.parameters.get("from_currency")
             to_currency = state.parameters.get("to_currency")
 
-            # Execute the tool
-            result = tool_executor.invoke({
-                "tool_name": "currency_conversion",
-                "amount": amount,
-                "from_currency": from_currency,
-                "to_currency": to_currency
-            })
+            # Execute the tool (usually already started by parse_input)
+            result = await _call_tool(state)
 
             # Update state
             state.add_intermediate_response(f"Converting {amount} {from_currency} to {to_currency}...")
@@ -260,14 +359,9 @@ def execute_task(state: AgentState) -> AgentState:
     elif task_type == "weather_information":
         try:
             location = state.parameters.get("location")
-            date = state.parameters.get("date")
 
-            # Execute the tool
-            result = tool_executor.invoke({
-                "tool_name": "weather_information",
-                "location": location,
-                "date": date
-            })
+            # Execute the tool (usually already started by parse_input)
+            result = await _call_tool(state)
 
             # Update state
             state.add_intermediate_response(f"Getting weather information for {location}...")
@@ -292,16 +386,15 @@ def create_agent_graph() -> StateGraph:
     graph.add_node("request_missing_parameters", request_missing_parameters)
     graph.add_node("execute_task", execute_task)
 
-    # Add edges
-    graph.add_edge("parse_input", check_parameters)
+    # Add edges; check_parameters routes directly out of parse_input
     graph.add_conditional_edges(
+        "parse_input",
         check_parameters,
         {
             "unknown_task": "handle_unknown_task",
             "missing_parameters": "request_missing_parameters",
             "complete_parameters": "execute_task"
-        },
-        edge_type="next"
+        }
     )
 
     # Set the entry point
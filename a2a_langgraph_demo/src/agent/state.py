@@ -2,84 +2,109 @@
 State definitions for the LangGraph agent.
 """
 
+import asyncio
+import time
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field
-from datetime import datetime
 
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
-class Message(BaseModel):
+
+@dataclass(slots=True)
+class Message:
     """A message in the conversation."""
     role: str
     content: str
 
 
-class AgentState(BaseModel):
-    """The state of the agent."""
+@dataclass(slots=True)
+class AgentState:
+    """The state of the agent.
+
+    This is an internal container that never crosses the wire, so it is a
+    plain slotted dataclass rather than a validated Pydantic model.
+    """
     
     # Conversation history
-    messages: List[Message] = Field(default_factory=list)
+    messages: List[Message] = field(default_factory=list)
+    
+    # Conversation history as LangChain messages, kept in step with `messages`
+    lc_messages: List[BaseMessage] = field(default_factory=list, repr=False)
     
     # Task-specific parameters
-    parameters: Dict[str, Any] = Field(default_factory=dict)
+    parameters: Dict[str, Any] = field(default_factory=dict)
     
     # A2A task state: created, working, input-required, completed, failed, canceled
     task_state: str = "created"
     
     # Additional context
-    context: Dict[str, Any] = Field(default_factory=dict)
+    context: Dict[str, Any] = field(default_factory=dict)
     
-    # Timestamp of the last update
-    last_updated: str = Field(default_factory=lambda: datetime.now().isoformat())
+    # Timestamp of the last update, in seconds since the epoch
+    last_updated: float = field(default_factory=time.time)
     
     # Final response to be returned
     final_response: Optional[str] = None
     
     # Intermediate responses for streaming
-    intermediate_responses: List[str] = Field(default_factory=list)
+    intermediate_responses: List[str] = field(default_factory=list)
     
     # Error message if any
     error: Optional[str] = None
+
+    # In-flight tool call started once the parameters were complete
+    pending_tool_call: Optional[asyncio.Task] = field(default=None, repr=False, compare=False)
+
+    # Positions of the latest user and assistant messages in `messages`
+    _last_user_idx: int = field(default=-1, repr=False, compare=False)
+    _last_assistant_idx: int = field(default=-1, repr=False, compare=False)
     
+    def touch(self) -> None:
+        """Record that the state was updated."""
+        self.last_updated = time.time()
+
     def add_user_message(self, content: str) -> None:
         """Add a user message to the conversation history."""
+        self._last_user_idx = len(self.messages)
         self.messages.append(Message(role="user", content=content))
-        self.last_updated = datetime.now().isoformat()
+        self.lc_messages.append(HumanMessage(content=content))
+        self.touch()
     
     def add_assistant_message(self, content: str) -> None:
         """Add an assistant message to the conversation history."""
+        self._last_assistant_idx = len(self.messages)
         self.messages.append(Message(role="assistant", content=content))
-        self.last_updated = datetime.now().isoformat()
+        self.lc_messages.append(AIMessage(content=content))
+        self.touch()
     
     def add_intermediate_response(self, content: str) -> None:
         """Add an intermediate response for streaming."""
         self.intermediate_responses.append(content)
-        self.last_updated = datetime.now().isoformat()
+        self.touch()
     
     def set_final_response(self, content: str) -> None:
         """Set the final response."""
         self.final_response = content
-        self.last_updated = datetime.now().isoformat()
+        self.touch()
     
     def set_error(self, error: str) -> None:
         """Set an error message."""
         self.error = error
         self.task_state = "failed"
-        self.last_updated = datetime.now().isoformat()
+        self.touch()
     
     def get_conversation_history(self) -> str:
         """Get the conversation history as a string."""
-        return "\n".join([f"{msg.role}: {msg.content}" for msg in self.messages])
+        return "\n".join(f"{msg.role}: {msg.content}" for msg in self.messages)
     
     def get_last_user_message(self) -> Optional[str]:
         """Get the last user message."""
-        for msg in reversed(self.messages):
-            if msg.role == "user":
-                return msg.content
-        return None
+        if self._last_user_idx < 0:
+            return None
+        return self.messages[self._last_user_idx].content
     
     def get_last_assistant_message(self) -> Optional[str]:
         """Get the last assistant message."""
-        for msg in reversed(self.messages):
-            if msg.role == "assistant":
-                return msg.content
-        return None
+        if self._last_assistant_idx < 0:
+            return None
+        return self.messages[self._last_assistant_idx].content
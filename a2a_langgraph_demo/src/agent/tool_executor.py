@@ -2,6 +2,7 @@
 Tool executor for LangGraph agent.
 """
 
+import asyncio
 from typing import Dict, List, Any, Optional, Union, Callable
 
 
@@ -33,10 +34,30 @@ class ToolExecutor:
         Returns:
             The result of the tool execution.
         """
-        tool_name = input_data.pop("tool_name")
+        tool_name = input_data.get("tool_name")
+        tool = self.tool_map.get(tool_name)
 
-        if tool_name not in self.tool_map:
+        if tool is None:
             raise ValueError(f"Tool {tool_name} not found. Available tools: {list(self.tool_map.keys())}")
 
-        tool = self.tool_map[tool_name]
-        return tool(**input_data)
+        kwargs = {k: v for k, v in input_data.items() if k != "tool_name"}
+
+        # StructuredTool objects can't be called directly; they take their
+        # arguments as one dict
+        if hasattr(tool, 'invoke'):
+            return tool.invoke(kwargs)
+        return tool(**kwargs)
+
+    async def ainvoke(self, input_data: Dict[str, Any]) -> Any:
+        """
+        Invoke a tool without blocking the event loop.
+
+        The tool runs in a worker thread so callers can overlap it with other work.
+
+        Args:
+            input_data: A dictionary with the tool name and parameters, as for `invoke`.
+
+        Returns:
+            The result of the tool execution.
+        """
+        return await asyncio.to_thread(self.invoke, input_data)
@@ -3,10 +3,14 @@ Tools for the LangGraph agent.
 """
 
 import json
-import random
-from typing import Dict, Any, Optional
+import time
+import functools
+import threading
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
 import requests
-from datetime import datetime
+
+from ..utils.clock import iso_now
 
 
 class CurrencyConverter:
@@ -30,36 +34,29 @@ class CurrencyConverter:
             }
         }
         
-        # Generate exchange rates for all currency pairs
+        # Generate exchange rates for all currency pairs, as a matrix indexed
+        # by currency code position
         self._generate_all_rates()
+
+        # Rates are fixed once generated, so memoize lookups per currency pair
+        self._lookup_rate = functools.lru_cache(maxsize=1024)(self._lookup_rate)
     
     def _generate_all_rates(self):
         """Generate exchange rates for all currency pairs."""
-        currencies = list(self.exchange_rates.keys()) + list(self.exchange_rates["USD"].keys())
-        currencies = list(set(currencies))  # Remove duplicates
-        
-        for base in currencies:
-            if base not in self.exchange_rates:
-                self.exchange_rates[base] = {}
-            
-            # If we have USD rates, use them to calculate other rates
-            if base != "USD" and "USD" not in self.exchange_rates[base]:
-                usd_rate = 1 / self.exchange_rates["USD"][base]
-                self.exchange_rates[base]["USD"] = usd_rate
-            
-            for target in currencies:
-                if base != target and target not in self.exchange_rates[base]:
-                    # Calculate cross rate via USD
-                    if base == "USD":
-                        rate = self.exchange_rates["USD"][target]
-                    elif target == "USD":
-                        rate = self.exchange_rates[base]["USD"]
-                    else:
-                        base_to_usd = self.exchange_rates[base]["USD"]
-                        usd_to_target = self.exchange_rates["USD"][target]
-                        rate = base_to_usd * usd_to_target
-                    
-                    self.exchange_rates[base][target] = rate
+        # Every cross rate goes via USD, so from -> to is usd[to] / usd[from]
+        # and the whole table is one outer product
+        codes = ["USD"] + sorted(self.exchange_rates["USD"])
+        usd_rates = np.array(
+            [1.0] + [self.exchange_rates["USD"][code] for code in codes[1:]],
+            dtype=np.float64
+        )
+        self._codes = {code: i for i, code in enumerate(codes)}
+        self.supported_currencies = frozenset(codes)
+        self._rates = np.outer(1.0 / usd_rates, usd_rates)
+
+    def _lookup_rate(self, from_currency: str, to_currency: str) -> float:
+        """Look up the rate for a pair of supported currencies."""
+        return float(self._rates[self._codes[from_currency], self._codes[to_currency]])
     
     def convert(self, amount: float, from_currency: str, to_currency: str) -> Dict[str, Any]:
         """
@@ -73,22 +70,22 @@ class CurrencyConverter:
         Returns:
             A dictionary with the conversion result
         """
-        from_currency = from_currency.upper()
-        to_currency = to_currency.upper()
+        # Codes usually arrive upper-cased already, so skip the copy then
+        if not from_currency.isupper():
+            from_currency = from_currency.upper()
+        if not to_currency.isupper():
+            to_currency = to_currency.upper()
         
-        if from_currency not in self.exchange_rates:
-            return {
-                "success": False,
-                "error": f"Currency {from_currency} not supported"
-            }
+        # Reject unknown codes before the rate cache so they never fill it
+        for code in (from_currency, to_currency):
+            if code not in self.supported_currencies:
+                return {
+                    "success": False,
+                    "error": f"Currency {code} not supported"
+                }
         
-        if to_currency not in self.exchange_rates[from_currency]:
-            return {
-                "success": False,
-                "error": f"Currency {to_currency} not supported"
-            }
+        rate = self._lookup_rate(from_currency, to_currency)
         
-        rate = self.exchange_rates[from_currency][to_currency]
         converted_amount = amount * rate
         
         return {
@@ -98,9 +95,27 @@ class CurrencyConverter:
             "to": to_currency,
             "rate": rate,
             "result": converted_amount,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now()
         }
 
+    def convert_batch(self, amounts: np.ndarray, from_currency: str, to_currency: str) -> np.ndarray:
+        """
+        Convert many amounts between the same pair of currencies at once.
+        
+        Args:
+            amounts: The amounts to convert
+            from_currency: The source currency code (e.g., "USD")
+            to_currency: The target currency code (e.g., "EUR")
+            
+        Returns:
+            An array with the converted amounts
+            
+        Raises:
+            KeyError: If either currency is not supported
+        """
+        rate = self._rates[self._codes[from_currency.upper()], self._codes[to_currency.upper()]]
+        return np.asarray(amounts, dtype=np.float64) * rate
+
 
 class WeatherService:
     """A tool for getting weather information."""
@@ -109,6 +124,32 @@ class WeatherService:
         # For demo purposes, we'll generate random weather data
         # In a real application, you would use an API like OpenWeatherMap
         self.conditions = ["Sunny", "Partly Cloudy", "Cloudy", "Rainy", "Thunderstorm", "Snowy", "Foggy", "Windy"]
+
+        # Draw uniform samples in blocks of 1024 readings rather than four
+        # RNG calls per reading
+        self._rng = np.random.default_rng()
+        self._pool = self._rng.random((1024, 4))
+        self._i = 0
+        self._pool_lock = threading.Lock()
+
+        # Readings are cached per location and date in 30-minute windows, so
+        # repeated questions get the same answer until the window rolls over
+        self._reading = functools.lru_cache(maxsize=1024)(self._reading)
+
+    def _reading(self, location: str, date: Optional[str], window: int) -> Tuple[float, str, int, float]:
+        """Generate a (temperature, condition, humidity, wind speed) reading."""
+        with self._pool_lock:
+            if self._i >= len(self._pool):
+                self._pool = self._rng.random((1024, 4))
+                self._i = 0
+            t, c, h, w = self._pool[self._i].tolist()
+            self._i += 1
+
+        temperature = round(t * 35, 1)
+        condition = self.conditions[int(c * len(self.conditions))]
+        humidity = int(30 + h * 61)
+        wind_speed = round(w * 30, 1)
+        return temperature, condition, humidity, wind_speed
     
     def get_weather(self, location: str, date: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -121,21 +162,19 @@ class WeatherService:
         Returns:
             A dictionary with weather information
         """
-        # Generate random weather data
-        temperature = round(random.uniform(0, 35), 1)
-        condition = random.choice(self.conditions)
-        humidity = random.randint(30, 90)
-        wind_speed = round(random.uniform(0, 30), 1)
+        temperature, condition, humidity, wind_speed = self._reading(
+            location.lower(), date, int(time.time() // 1800)
+        )
         
         return {
             "success": True,
             "location": location,
-            "date": date or datetime.now().strftime("%Y-%m-%d"),
+            "date": date or iso_now()[:10],
             "temperature": temperature,
             "condition": condition,
             "humidity": humidity,
             "wind_speed": wind_speed,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now()
         }
 
 
@@ -3,3 +3,4 @@ A2A client module.
 """
 
 from .a2a_client import A2AClient
+from .a2a_async_client import AsyncA2AClient
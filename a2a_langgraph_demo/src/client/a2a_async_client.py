@@ -0,0 +1,142 @@
+"""
+Asynchronous A2A client implementation.
+"""
+
+import asyncio
+import itertools
+import httpx
+import orjson
+from typing import Dict, List, Any, AsyncGenerator, Tuple
+
+
+class AsyncA2AClient:
+    """Asynchronous A2A client.
+
+    Calls share a pool of keep-alive connections. Against an https:// agent
+    HTTP/2 is negotiated, so many RPCs can be in flight over one connection.
+    """
+
+    def __init__(self, url: str = "http://localhost:10000"):
+        """Initialize the async A2A client."""
+        self.url = url
+        self._headers = {"Content-Type": "application/json"}
+        self._ids = itertools.count(1)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16),
+            timeout=httpx.Timeout(30.0, read=None)
+        )
+
+    async def __aenter__(self) -> "AsyncA2AClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def _call(self, method: str, params: Dict[str, Any], action: str) -> Dict[str, Any]:
+        """Send a JSON-RPC request and return its result."""
+        response = await self._client.post(
+            self.url,
+            content=orjson.dumps({
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": method,
+                "params": params
+            }),
+            headers=self._headers
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to {action}: {response.text}")
+
+        return orjson.loads(response.content)["result"]
+
+    @staticmethod
+    def _send_params(task_id: str, session_id: str, message: str) -> Dict[str, Any]:
+        return {
+            "id": task_id,
+            "sessionId": session_id,
+            "acceptedOutputModes": ["text"],
+            "message": {
+                "role": "user",
+                "parts": [
+                    {
+                        "type": "text",
+                        "text": message
+                    }
+                ]
+            }
+        }
+
+    async def get_agent_card(self) -> Dict[str, Any]:
+        """Get the agent card."""
+        return await self._call("agent/getCard", {}, "get agent card")
+
+    async def send_task(self, task_id: str, session_id: str, message: str) -> Dict[str, Any]:
+        """Send a task to the agent."""
+        return await self._call(
+            "tasks/send", self._send_params(task_id, session_id, message), "send task"
+        )
+
+    async def gather_send(self, requests_list: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """
+        Send several tasks concurrently.
+
+        Args:
+            requests_list: (task_id, session_id, message) triples
+
+        Returns:
+            The resulting tasks, in the same order as `requests_list`
+        """
+        return await asyncio.gather(*(
+            self.send_task(task_id, session_id, message)
+            for task_id, session_id, message in requests_list
+        ))
+
+    async def stream_task(self, task_id: str, session_id: str, message: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a task from the agent, yielding each task update."""
+        async with self._client.stream(
+            "POST",
+            self.url,
+            content=orjson.dumps({
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": "tasks/sendSubscribe",
+                "params": self._send_params(task_id, session_id, message)
+            }),
+            headers=self._headers
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"Failed to stream task: {response.text}")
+
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    yield orjson.loads(line[5:])["result"]
+
+    async def get_task(self, task_id: str, session_id: str) -> Dict[str, Any]:
+        """Get a task."""
+        return await self._call(
+            "tasks/get",
+            {
+                "id": task_id,
+                "sessionId": session_id,
+                "includeHistory": False
+            },
+            "get task"
+        )
+
+    async def cancel_task(self, task_id: str, session_id: str) -> Dict[str, Any]:
+        """Cancel a task."""
+        return await self._call(
+            "tasks/cancel",
+            {
+                "id": task_id,
+                "sessionId": session_id
+            },
+            "cancel task"
+        )
@@ -2,140 +2,464 @@
 A2A client implementation.
 """
 
-import json
-import uuid
+import gzip
+import time
+import queue
+import itertools
 import asyncio
+import threading
+import orjson
+from concurrent.futures import Future
 import requests
-import sseclient
-from typing import Dict, List, Optional, Any, Union, AsyncGenerator, Callable
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Any, Union, AsyncGenerator, Callable, Tuple
 from datetime import datetime
 
 
+# Request body for tasks/send, tasks/sendSubscribe and sessions/send with only the per-call
+# fields left to fill in: id, method, task id, session id and message text
+_SEND_TEMPLATE = (
+    b'{"jsonrpc":"2.0","id":%d,"method":"%s","params":{"id":%s,"sessionId":%s,'
+    b'"acceptedOutputModes":["text"],"message":{"role":"user","parts":[{"type":"text","text":%s}]}}}'
+)
+
+# Calls passed to submit() are collected for up to this long, up to this many
+# at a time, before being sent together
+_SUBMIT_WAIT = 0.005
+_SUBMIT_BATCH_SIZE = 32
+
+# Request bodies larger than this are gzip-compressed
+_COMPRESS_MIN_SIZE = 1024
+
+# Seconds to wait for the next event of a task streamed over a session
+# subscription before giving up on it
+_SESSION_EVENT_TIMEOUT = 60
+
+
 class A2AClient:
     """A2A client implementation."""
     
     def __init__(self, url: str = "http://localhost:10000"):
         """Initialize the A2A client."""
         self.url = url
+        self._agent_card: Optional[Dict[str, Any]] = None
+
+        # JSON-RPC ids only need to be unique per client, so count them
+        self._ids = itertools.count(1)
+        self._headers = {
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip, deflate"
+        }
+        self._gzip_headers = {**self._headers, "Content-Encoding": "gzip"}
+
+        # Reuse pooled keep-alive connections across RPCs instead of opening a
+        # new connection per request
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # Queue and sender thread for submit(), started on first use
+        self._submitted: queue.Queue = queue.Queue()
+        self._submit_lock = threading.Lock()
+        self._submit_thread: Optional[threading.Thread] = None
+
+        # Open session event streams by session id, and the event queue of
+        # each task currently waiting on one, by task id
+        self._subscriptions: Dict[str, requests.Response] = {}
+        self._task_events: Dict[str, Tuple[str, queue.Queue]] = {}
+
+        # Open the first pooled connection in the background so the first
+        # RPC doesn't wait on DNS and connection setup
+        threading.Thread(target=self._warm, daemon=True).start()
+
+    def _warm(self) -> None:
+        """Establish a connection to the agent ahead of the first request."""
+        try:
+            self._session.head(self.url, timeout=2)
+        except requests.RequestException:
+            # The first real request will connect (and report errors) itself
+            pass
+
+    def close(self) -> None:
+        """Send any queued calls, then close the underlying HTTP session."""
+        with self._submit_lock:
+            if self._submit_thread is not None:
+                self._submitted.put(None)
+                self._submit_thread.join()
+                self._submit_thread = None
+        for session_id in list(self._subscriptions):
+            self.unsubscribe_session(session_id)
+        self._session.close()
+
+    def _post(self, body: bytes, stream: bool = False) -> requests.Response:
+        """POST a JSON-RPC body to the agent, compressing it if it's large."""
+        if len(body) > _COMPRESS_MIN_SIZE:
+            return self._session.post(
+                self.url,
+                headers=self._gzip_headers,
+                data=gzip.compress(body, compresslevel=1),
+                stream=stream
+            )
+        return self._session.post(self.url, headers=self._headers, data=body, stream=stream)
+
+    def subscribe_session(self, session_id: str) -> None:
+        """
+        Open one long-lived event stream for a session.
+
+        While it is open, stream_task() for tasks in the session only posts
+        the task with sessions/send and receives its events over this
+        stream, rather than opening a new stream per task. If the server
+        that takes the post has no subscription for the session, as can
+        happen with several server workers, stream_task() opens a stream
+        for the task after all.
+
+        Args:
+            session_id: The session to subscribe to
+        """
+        if session_id in self._subscriptions:
+            return
+
+        response = self._post(
+            orjson.dumps({
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": "sessions/subscribe",
+                "params": {
+                    "sessionId": session_id
+                }
+            }),
+            stream=True
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to subscribe to session: {response.text}")
+
+        self._subscriptions[session_id] = response
+        threading.Thread(
+            target=self._read_session_events, args=(session_id, response), daemon=True
+        ).start()
+
+    def unsubscribe_session(self, session_id: str) -> None:
+        """Close a session's event stream, if one is open."""
+        response = self._subscriptions.pop(session_id, None)
+        if response is not None:
+            response.close()
+
+    def _read_session_events(self, session_id: str, response: requests.Response) -> None:
+        """Route the events on a session stream to the tasks waiting for them."""
+        try:
+            for line in response.iter_lines():
+                if line.startswith(b"data:"):
+                    result = orjson.loads(line[5:])["result"]
+                    waiting = self._task_events.get(result.get("id"))
+                    if waiting is not None:
+                        waiting[1].put(result)
+        except Exception:
+            # The stream was closed or dropped; waiting tasks are woken below
+            pass
+        finally:
+            if self._subscriptions.get(session_id) is response:
+                del self._subscriptions[session_id]
+            for waiting_session_id, events in list(self._task_events.values()):
+                if waiting_session_id == session_id:
+                    events.put(None)
+
+    def submit(self, method: str, params: Dict[str, Any]) -> Future:
+        """
+        Queue a JSON-RPC call to be sent in the background.
+
+        Calls submitted within a few milliseconds of each other are sent
+        together as one batch request.
+
+        Args:
+            method: The JSON-RPC method, e.g. "tasks/send"
+            params: The method parameters
+
+        Returns:
+            A future that resolves to the call's result
+        """
+        future: Future = Future()
+        with self._submit_lock:
+            if self._submit_thread is None:
+                self._submit_thread = threading.Thread(target=self._send_submitted, daemon=True)
+                self._submit_thread.start()
+            self._submitted.put((method, params, future))
+        return future
+
+    def _send_submitted(self) -> None:
+        """Drain the submit queue in batches until the client is closed."""
+        try:
+            while (item := self._submitted.get()) is not None:
+                calls = [item]
+                deadline = time.monotonic() + _SUBMIT_WAIT
+                while len(calls) < _SUBMIT_BATCH_SIZE:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._submitted.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        # Send what we have, then stop
+                        self._submitted.put(None)
+                        break
+                    calls.append(item)
+
+                # Skip calls whose futures were cancelled while queued; the
+                # rest can no longer be cancelled, so resolving them is safe
+                calls = [call for call in calls if call[2].set_running_or_notify_cancel()]
+                if calls:
+                    self._resolve_submitted(calls)
+        except BaseException:
+            # Let the next submit() start a new sender rather than queue
+            # calls nothing will send. close() holds the lock while joining
+            # this thread, so it isn't taken here.
+            if self._submit_thread is threading.current_thread():
+                self._submit_thread = None
+            raise
+
+    def _resolve_submitted(self, calls: List[Tuple[str, Dict[str, Any], Future]]) -> None:
+        """Send one group of submitted calls and resolve their futures."""
+        try:
+            if len(calls) == 1:
+                method, params, _ = calls[0]
+                responses = [self._call(method, params)]
+            else:
+                responses = self.batch([(method, params) for method, params, _ in calls])
+        except Exception as e:
+            for _, _, future in calls:
+                future.set_exception(e)
+            return
+
+        for (method, _, future), response in zip(calls, responses):
+            if response is None:
+                future.set_exception(Exception(f"No response to {method}"))
+            elif response.get("error") is not None:
+                future.set_exception(Exception(f"Failed to call {method}: {response['error']}"))
+            else:
+                future.set_result(response.get("result"))
+
+    def _call(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a single JSON-RPC call and return the response object."""
+        response = self._post(
+            orjson.dumps({
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": method,
+                "params": params
+            })
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to call {method}: {response.text}")
+
+        return orjson.loads(response.content)
     
+    def batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Send several JSON-RPC calls in a single HTTP request.
+
+        Args:
+            calls: A list of (method, params) pairs, e.g. [("tasks/get", {...})]
+
+        Returns:
+            The JSON-RPC response objects, in the same order as `calls`
+        """
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": method,
+                "params": params
+            }
+            for method, params in calls
+        ]
+        response = self._post(
+            orjson.dumps(payload)
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to send batch: {response.text}")
+
+        # Batch responses may arrive in any order; match them up by id
+        by_id = {item.get("id"): item for item in orjson.loads(response.content)}
+        return [by_id.get(call["id"]) for call in payload]
+
     def get_agent_card(self) -> Dict[str, Any]:
-        """Get the agent card."""
-        response = requests.post(
-            self.url,
-            json={
+        """Get the agent card, fetching it from the agent on first use."""
+        if self._agent_card is not None:
+            return self._agent_card
+
+        response = self._post(
+            orjson.dumps({
                 "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
+                "id": next(self._ids),
                 "method": "agent/getCard",
                 "params": {}
-            }
+            })
         )
         
         if response.status_code != 200:
             raise Exception(f"Failed to get agent card: {response.text}")
         
-        return response.json()["result"]
+        self._agent_card = orjson.loads(response.content)["result"]
+        return self._agent_card
+    
+    def _send_body(self, method: bytes, task_id: str, session_id: str, message: str) -> bytes:
+        """Build a task send request body from the preserialized template."""
+        return _SEND_TEMPLATE % (
+            next(self._ids),
+            method,
+            orjson.dumps(task_id),
+            orjson.dumps(session_id),
+            orjson.dumps(message)
+        )
     
     def send_task(self, task_id: str, session_id: str, message: str) -> Dict[str, Any]:
         """Send a task to the agent."""
-        response = requests.post(
-            self.url,
-            json={
-                "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
-                "method": "tasks/send",
-                "params": {
-                    "id": task_id,
-                    "sessionId": session_id,
-                    "acceptedOutputModes": ["text"],
-                    "message": {
-                        "role": "user",
-                        "parts": [
-                            {
-                                "type": "text",
-                                "text": message
-                            }
-                        ]
-                    }
-                }
-            }
+        response = self._post(
+            self._send_body(b"tasks/send", task_id, session_id, message)
         )
         
         if response.status_code != 200:
             raise Exception(f"Failed to send task: {response.text}")
         
-        return response.json()["result"]
+        return orjson.loads(response.content)["result"]
+    
+    def send_task_async(self, task_id: str, session_id: str, message: str) -> Future:
+        """Queue a task to be sent to the agent, batched with other submitted calls."""
+        return self.submit(
+            "tasks/send",
+            {
+                "id": task_id,
+                "sessionId": session_id,
+                "acceptedOutputModes": ["text"],
+                "message": {
+                    "role": "user",
+                    "parts": [
+                        {
+                            "type": "text",
+                            "text": message
+                        }
+                    ]
+                }
+            }
+        )
     
     def stream_task(self, task_id: str, session_id: str, message: str, callback: Callable[[Dict[str, Any]], None]) -> None:
         """Stream a task from the agent."""
-        response = requests.post(
-            self.url,
-            json={
-                "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
-                "method": "tasks/sendSubscribe",
-                "params": {
-                    "id": task_id,
-                    "sessionId": session_id,
-                    "acceptedOutputModes": ["text"],
-                    "message": {
-                        "role": "user",
-                        "parts": [
-                            {
-                                "type": "text",
-                                "text": message
-                            }
-                        ]
-                    }
-                }
-            },
+        if session_id in self._subscriptions and self._stream_over_session(task_id, session_id, message, callback):
+            return
+
+        response = self._post(
+            self._send_body(b"tasks/sendSubscribe", task_id, session_id, message),
             stream=True
         )
         
         if response.status_code != 200:
             raise Exception(f"Failed to stream task: {response.text}")
         
-        client = sseclient.SSEClient(response)
-        for event in client.events():
-            data = json.loads(event.data)
-            callback(data["result"])
+        # Read the stream on a separate thread so the network reads overlap
+        # with decoding and the callback on this one
+        payloads: queue.Queue = queue.Queue()
+        errors: List[BaseException] = []
+
+        def read_events() -> None:
+            try:
+                for line in response.iter_lines():
+                    if line.startswith(b"data:"):
+                        payloads.put(line[5:])
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                payloads.put(None)
+
+        reader = threading.Thread(target=read_events, daemon=True)
+        reader.start()
+        try:
+            while (payload := payloads.get()) is not None:
+                callback(orjson.loads(payload)["result"])
+        finally:
+            response.close()
+            reader.join()
+
+        if errors:
+            raise errors[0]
+    
+    def _stream_over_session(self, task_id: str, session_id: str, message: str, callback: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        Send a streaming task and take its events from the session's open stream.
+
+        Returns False, without sending the task, if the server has no
+        subscription for the session.
+        """
+        events: queue.Queue = queue.Queue()
+        self._task_events[task_id] = (session_id, events)
+        try:
+            response = self._post(
+                self._send_body(b"sessions/send", task_id, session_id, message)
+            )
+
+            if response.status_code == 400:
+                return False
+            if response.status_code != 200:
+                raise Exception(f"Failed to stream task: {response.text}")
+
+            try:
+                while (result := events.get(timeout=_SESSION_EVENT_TIMEOUT)) is not None:
+                    callback(result)
+                    if result.get("final"):
+                        return True
+            except queue.Empty:
+                raise Exception("Timed out waiting for task events on the session stream") from None
+        finally:
+            del self._task_events[task_id]
+
+        raise Exception("Session event stream closed before the task finished")
     
     def get_task(self, task_id: str, session_id: str) -> Dict[str, Any]:
         """Get a task."""
-        response = requests.post(
-            self.url,
-            json={
+        response = self._post(
+            orjson.dumps({
                 "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
+                "id": next(self._ids),
                 "method": "tasks/get",
                 "params": {
                     "id": task_id,
                     "sessionId": session_id,
                     "includeHistory": False
                 }
-            }
+            })
         )
         
         if response.status_code != 200:
             raise Exception(f"Failed to get task: {response.text}")
         
-        return response.json()["result"]
+        return orjson.loads(response.content)["result"]
     
     def cancel_task(self, task_id: str, session_id: str) -> Dict[str, Any]:
         """Cancel a task."""
-        response = requests.post(
-            self.url,
-            json={
+        response = self._post(
+            orjson.dumps({
                 "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
+                "id": next(self._ids),
                 "method": "tasks/cancel",
                 "params": {
                     "id": task_id,
                     "sessionId": session_id
                 }
-            }
+            })
         )
         
         if response.status_code != 200:
             raise Exception(f"Failed to cancel task: {response.text}")
         
-        return response.json()["result"]
+        return orjson.loads(response.content)["result"]
@@ -4,12 +4,11 @@ Main entry point for the A2A client.
 
 import os
 import uuid
-import time
 import traceback
 from dotenv import load_dotenv
 
 from .a2a_client import A2AClient
-from ..utils.sentry import initialize_sentry, capture_exception, capture_message, set_tag, set_context
+from ..utils.sentry import initialize_sentry, capture_exception, set_context
 
 # Load environment variables
 load_dotenv()
@@ -20,24 +19,6 @@ if sentry_initialized:
     print("Sentry initialized for error monitoring")
 
 
-def print_task_result(task):
-    """Print task result."""
-    print(f"\nTask ID: {task['id']}")
-    print(f"Status: {task['status']['state']}")
-
-    if task['status'].get('message'):
-        print(f"Message: {task['status']['message']['parts'][0]['text']}")
-
-    if task.get('artifacts'):
-        print(f"Result: {task['artifacts'][0]['parts'][0]['text']}")
-
-    if task.get('artifact'):
-        print(f"Result: {task['artifact']['parts'][0]['text']}")
-
-    print(f"Timestamp: {task['status']['timestamp']}")
-    print("-" * 50)
-
-
 def handle_stream_event(event):
     """Handle stream event."""
     if event.get('status'):
@@ -46,6 +27,8 @@ def handle_stream_event(event):
                 print(f"Working: {event['status']['message']['parts'][0]['text']}")
         else:
             print(f"Status: {event['status']['state']}")
+            if event['status'].get('message'):
+                print(f"Message: {event['status']['message']['parts'][0]['text']}")
 
     if event.get('artifact'):
         print(f"Result: {event['artifact']['parts'][0]['text']}")
@@ -54,6 +37,26 @@ def handle_stream_event(event):
         print("Task completed.")
 
 
+def stream_conversation(client, task_id, session_id, message):
+    """Stream a task, prompting for follow-ups for as long as the agent needs input."""
+    while True:
+        last_state = {}
+
+        def on_event(event):
+            handle_stream_event(event)
+            if event.get('status'):
+                last_state['state'] = event['status']['state']
+
+        client.stream_task(task_id, session_id, message, on_event)
+
+        if last_state.get('state') != 'input-required':
+            return
+
+        # The agent pushed input-required; answer on the same task
+        message = input("You: ")
+        print("\nAgent:")
+
+
 def run_client():
     """Run the A2A client."""
     # Create client
@@ -70,9 +73,8 @@ def run_client():
     # Interactive session
     session_id = str(uuid.uuid4())
     print(f"Starting interactive session (Session ID: {session_id})")
-    print("Type 'exit' to quit, 'stream' to toggle streaming mode.")
-
-    streaming_mode = False
+    client.subscribe_session(session_id)
+    print("Type 'exit' to quit.")
 
     while True:
         # Get user input
@@ -81,28 +83,12 @@ def run_client():
         if user_input.lower() == 'exit':
             break
 
-        if user_input.lower() == 'stream':
-            streaming_mode = not streaming_mode
-            print(f"Streaming mode: {'ON' if streaming_mode else 'OFF'}")
-            continue
-
         # Generate task ID
         task_id = str(uuid.uuid4())
 
         try:
-            if streaming_mode:
-                print("\nAgent (streaming):")
-                client.stream_task(task_id, session_id, user_input, handle_stream_event)
-            else:
-                print("\nAgent:")
-                task = client.send_task(task_id, session_id, user_input)
-                print_task_result(task)
-
-                # If input required, wait for user input
-                while task['status']['state'] == 'input-required':
-                    follow_up = input("You: ")
-                    task = client.send_task(task_id, session_id, follow_up)
-                    print_task_result(task)
+            print("\nAgent:")
+            stream_conversation(client, task_id, session_id, user_input)
 
         except Exception as e:
             # Capture exception with Sentry
@@ -112,7 +98,6 @@ def run_client():
             set_context("client_request", {
                 "task_id": task_id,
                 "session_id": session_id,
-                "streaming_mode": streaming_mode,
                 "user_input": user_input
             })
 
@@ -127,6 +112,8 @@ def run_client():
             print(f"Error: {str(e)}")
             print(f"Error ID: {error_id} (reference this ID when reporting issues)")
 
+    client.close()
+
 
 if __name__ == "__main__":
     run_client()
@@ -5,6 +5,6 @@ A2A server module.
 from .a2a_server import A2AServer
 from .a2a_models import (
     AgentCard, AgentCapabilities, AgentSkill, AgentProvider,
-    Task, TaskStatus, Artifact, Part, Message,
+    Task, TaskStatus, Artifact, Part, TextPart, DataPart, FilePart, Message,
     JSONRPCRequest, JSONRPCResponse, JSONRPCError
 )
@@ -2,34 +2,62 @@
 A2A protocol models.
 """
 
-from typing import Dict, List, Optional, Any, Union, Literal
-from pydantic import BaseModel, Field
-from datetime import datetime
+import time
+from typing import Dict, List, Optional, Any, Union, Literal, Annotated, Tuple
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
 
+from ..utils.clock import iso_format
 
-class Part(BaseModel):
-    """A part of a message or artifact."""
-    type: str
-    text: Optional[str] = None
-    data: Optional[Dict[str, Any]] = None
-    file: Optional[Dict[str, Any]] = None
+
+class FrozenModel(BaseModel):
+    """Base for task payload models, which are never modified once built."""
+    model_config = ConfigDict(frozen=True)
+
+
+class TextPart(FrozenModel):
+    """A text part of a message or artifact."""
+    type: Literal["text"] = "text"
+    text: str
     metadata: Optional[Dict[str, Any]] = None
 
 
-class Message(BaseModel):
+class DataPart(FrozenModel):
+    """A structured data part of a message or artifact."""
+    type: Literal["data"] = "data"
+    data: Dict[str, Any]
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class FilePart(FrozenModel):
+    """A file part of a message or artifact."""
+    type: Literal["file"] = "file"
+    file: Dict[str, Any]
+    metadata: Optional[Dict[str, Any]] = None
+
+
+# Validation dispatches on the "type" tag instead of trying each part model
+Part = Annotated[Union[TextPart, DataPart, FilePart], Field(discriminator="type")]
+
+
+class Message(FrozenModel):
     """A message in the A2A protocol."""
     role: str
     parts: List[Part]
 
 
-class TaskStatus(BaseModel):
+class TaskStatus(FrozenModel):
     """The status of a task."""
     state: Literal["created", "working", "input-required", "completed", "failed", "canceled"]
     message: Optional[Message] = None
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: float = Field(default_factory=time.time)
+
+    @field_serializer("timestamp")
+    def serialize_timestamp(self, timestamp: float) -> str:
+        """Send the epoch timestamp as an ISO 8601 string, as the protocol expects."""
+        return iso_format(timestamp)
 
 
-class Artifact(BaseModel):
+class Artifact(FrozenModel):
     """An artifact produced by an agent."""
     name: Optional[str] = None
     description: Optional[str] = None
@@ -40,12 +68,12 @@ class Artifact(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
-class Task(BaseModel):
+class Task(FrozenModel):
     """A task in the A2A protocol."""
     id: str
     status: TaskStatus
     artifacts: Optional[List[Artifact]] = None
-    history: List[Any] = Field(default_factory=list)
+    history: Tuple[Any, ...] = ()
     final: Optional[bool] = None
     artifact: Optional[Artifact] = None
 
@@ -124,16 +152,16 @@ class JSONRPCRequest(BaseModel):
     params: Any
 
 
-class JSONRPCResponse(BaseModel):
-    """JSON-RPC response."""
-    jsonrpc: str = "2.0"
-    id: Optional[Union[int, str]] = None
-    result: Optional[Any] = None
-    error: Optional[Dict[str, Any]] = None
-
-
 class JSONRPCError(BaseModel):
     """JSON-RPC error."""
     code: int
     message: str
     data: Optional[Any] = None
+
+
+class JSONRPCResponse(BaseModel):
+    """JSON-RPC response."""
+    jsonrpc: str = "2.0"
+    id: Optional[Union[int, str]] = None
+    result: Optional[Any] = None
+    error: Optional[JSONRPCError] = None
@@ -3,17 +3,20 @@ A2A server implementation.
 """
 
 import os
-import json
+import zlib
+import time
+import orjson
 import asyncio
 import uuid
-import traceback
-from typing import Dict, List, Optional, Any, Union, AsyncGenerator
-from datetime import datetime
+import weakref
+from typing import Dict, List, Optional, Any, Union, AsyncGenerator, Set, Tuple, Type, Callable, Awaitable
 from dotenv import load_dotenv
 
 from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sse_starlette.sse import EventSourceResponse
 
 # Import Sentry utilities
@@ -21,18 +24,125 @@ from ..utils.sentry import capture_exception, capture_message, set_tag, set_cont
 
 from .a2a_models import (
     AgentCard, AgentCapabilities, AgentSkill, AgentProvider,
-    Task, TaskStatus, Artifact, Part, Message,
+    Task, TaskStatus, Artifact, TextPart, Message,
     JSONRPCRequest, JSONRPCResponse, JSONRPCError,
     TaskIdParams, TaskQueryParams, TaskSendParams
 )
 
 from ..agent import agent_graph, AgentState
+from .task_store import MemoryTaskStore, RedisTaskStore
 
 # Load environment variables
 load_dotenv()
 
-# Session storage
-sessions: Dict[str, Dict[str, AgentState]] = {}
+# Task states are kept for an hour after their last use, up to this many
+# when held in memory. Setting REDIS_URL shares them between workers instead.
+MAX_TASKS = int(os.getenv("MAX_TASKS", "10000"))
+TASK_TTL_SECONDS = int(os.getenv("TASK_TTL_SECONDS", "3600"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Largest request body accepted once decompressed, in bytes, so a small
+# gzip-compressed request can't expand into an arbitrarily large one
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", "1048576"))
+
+# Optional pause between streamed updates, in seconds, for UIs that want pacing
+SSE_MIN_INTERVAL = float(os.getenv("SSE_MIN_INTERVAL", "0"))
+
+# Seconds between keep-alive comments on idle event streams, so proxies
+# don't drop long-lived connections such as session subscriptions
+SSE_PING_INTERVAL = int(os.getenv("SSE_PING_INTERVAL", "15"))
+
+# Frames produced within this many milliseconds of each other are sent in a
+# single write. This holds each frame back by up to that long, so it is off
+# (0, every frame sent on its own) unless a deployment opts in.
+SSE_FLUSH_MS = float(os.getenv("SSE_FLUSH_MS", "0"))
+
+
+# Error response bodies following the envelope, with only the data values left to fill in
+_METHOD_NOT_FOUND_TEMPLATE = b'"error":{"code":-32601,"message":"Method not found","data":{"method":%s}}}'
+_INTERNAL_ERROR_TEMPLATE = b'"error":{"code":-32603,"message":"Internal error","data":{"error":%s,"error_id":%s}}}'
+
+
+def _envelope(request_id: Any) -> bytes:
+    """Encode the start of a JSON-RPC response, up to and including its id."""
+    if request_id is None:
+        return b'{"jsonrpc":"2.0",'
+    return b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) + b','
+
+
+def _encode_model(o: Any) -> Any:
+    """orjson fallback for values it can't serialize natively."""
+    if isinstance(o, BaseModel):
+        return o.model_dump(exclude_none=True)
+    return str(o)
+
+
+async def coalesce_frames(frames: AsyncGenerator[bytes, None], window: float) -> AsyncGenerator[bytes, None]:
+    """
+    Join SSE frames that arrive close together, so they go out in one write.
+    
+    Args:
+        frames: Complete, encoded SSE frames
+        window: How long to wait for more frames after the first one, in seconds
+    """
+    pending: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for frame in frames:
+                pending.put_nowait(frame)
+        finally:
+            pending.put_nowait(None)
+
+    loop = asyncio.get_running_loop()
+    pump_task = asyncio.create_task(pump())
+    try:
+        done = False
+        while not done and (frame := await pending.get()) is not None:
+            batch = [frame]
+            deadline = loop.time() + window
+            while (timeout := deadline - loop.time()) > 0:
+                try:
+                    frame = await asyncio.wait_for(pending.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if frame is None:
+                    done = True
+                    break
+                batch.append(frame)
+
+            # Frames already end with a blank line, so they can simply be joined
+            yield b"".join(batch)
+
+        # Re-raise anything the stream failed with
+        await pump_task
+    finally:
+        # Stop the underlying stream if the client went away
+        pump_task.cancel()
+
+
+class PydanticResponse(Response):
+    """JSON response rendered with orjson, taking Pydantic models anywhere in its content.
+
+    Unlike JSONResponse, the content is serialized in one pass without going
+    through FastAPI's jsonable_encoder first.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # A lone model is serialized straight to JSON by Pydantic's Rust core
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(exclude_none=True).encode()
+        return orjson.dumps(content, default=_encode_model)
+
+
+class MethodNotFoundError(Exception):
+    """Raised when a JSON-RPC method is not supported."""
+
+    def __init__(self, method: str):
+        super().__init__(f"Method not found: {method}")
+        self.method = method
 
 
 class A2AServer:
@@ -51,118 +161,246 @@ class A2AServer:
             allow_headers=["*"],
         )
 
+        # Compress large JSON responses for clients that accept it
+        self.app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+        # Task states, keyed by (session id, task id)
+        if REDIS_URL:
+            self._store = RedisTaskStore(REDIS_URL, ttl=TASK_TTL_SECONDS)
+        else:
+            self._store = MemoryTaskStore(maxsize=MAX_TASKS, ttl=TASK_TTL_SECONDS)
+
+        # One lock per task, so concurrent sends to a task run one at a time
+        # instead of interleaving their updates to its state. Locks are
+        # dropped once no request holds or waits on them. They only cover
+        # this process, not other workers sharing the Redis store.
+        self._locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+        # Event queues of the open session subscriptions, by session id, and
+        # the background tasks publishing to them
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._publishing: Set[asyncio.Task] = set()
+
+        # The agent card doesn't change after startup, so build and serialize it once
+        self._agent_card = self._build_agent_card()
+        self._agent_card_json = self._agent_card.model_dump_json(exclude_none=True).encode()
+
+        # Non-streaming JSON-RPC methods, with the model their params are
+        # parsed into (None if they take none) and their handler
+        self._methods: Dict[str, Tuple[Optional[Type[BaseModel]], Callable[[Any], Awaitable[Any]]]] = {
+            "agent/getCard": (None, self.agent_card_result),
+            "tasks/send": (TaskSendParams, self.process_task),
+            "tasks/get": (TaskQueryParams, self.get_task),
+            "tasks/cancel": (TaskIdParams, self.cancel_task),
+        }
+
         # Register routes
         self.app.post("/")(self.handle_jsonrpc)
 
-    async def handle_jsonrpc(self, request: Request) -> JSONResponse:
+        self._warm_up()
+
+    def _warm_up(self) -> None:
+        """Run a request's worth of model validation and serialization once at startup.
+
+        Pydantic builds the schemas when the models are defined, but the first
+        validations and dumps through the discriminated part union and the
+        untyped result field still pay one-off costs. Pay them here rather
+        than on the first client request.
+        """
+        params = TaskSendParams.model_validate({
+            "id": "warm-up",
+            "sessionId": "warm-up",
+            "message": {"role": "user", "parts": [{"type": "text", "text": "warm-up"}]}
+        })
+        task = self.build_task(params.id, AgentState(), time.time())
+        PydanticResponse(content=JSONRPCResponse(jsonrpc="2.0", id=0, result=task))
+        PydanticResponse(content=[self.error_response(0, -32603, "Internal error")])
+        self.sse_frame(self.sse_prefix(0, params.id), {"status": task.status, "final": True})
+
+    async def handle_jsonrpc(self, request: Request) -> Response:
         """Handle JSON-RPC requests."""
+        jsonrpc_request = None
         try:
-            # Parse request
-            data = await request.json()
+            # Parse request, which clients may send gzip-compressed
+            body = await request.body()
+            if request.headers.get("content-encoding") == "gzip":
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                body = decompressor.decompress(body, MAX_REQUEST_BYTES)
+                if decompressor.unconsumed_tail:
+                    return PydanticResponse(
+                        content=self.error_response(
+                            None, -32600, "Invalid Request", {"error": "Request body too large"}
+                        ),
+                        status_code=413
+                    )
+            data = orjson.loads(body)
+
+            # A JSON-RPC batch is a list of calls, answered with a list of responses
+            if isinstance(data, list):
+                return PydanticResponse(content=await self.handle_batch(data))
+
             jsonrpc_request = JSONRPCRequest(**data)
 
-            # Route to appropriate handler
+            # Serve the agent card from its pre-serialized bytes
             if jsonrpc_request.method == "agent/getCard":
-                result = self.get_agent_card()
-                return JSONResponse(
-                    content=JSONRPCResponse(
-                        jsonrpc="2.0",
-                        id=jsonrpc_request.id,
-                        result=result
-                    ).dict(exclude_none=True)
-                )
+                return self.agent_card_response(jsonrpc_request.id)
+
+            # A session subscription receives the events of every task
+            # streamed in that session over one long-lived connection
+            if jsonrpc_request.method == "sessions/subscribe":
+                session_id = jsonrpc_request.params["sessionId"]
+                return self.sse_response(self.session_events(session_id, self.subscribe(session_id)))
 
-            elif jsonrpc_request.method == "tasks/send":
+            # Streaming responses are sent as server-sent events
+            if jsonrpc_request.method == "tasks/sendSubscribe":
                 params = TaskSendParams(**jsonrpc_request.params)
-                result = await self.process_task(params)
-                return JSONResponse(
-                    content=JSONRPCResponse(
-                        jsonrpc="2.0",
-                        id=jsonrpc_request.id,
-                        result=result
-                    ).dict(exclude_none=True)
-                )
+                return self.sse_response(self.stream_task(params, jsonrpc_request.id))
 
-            elif jsonrpc_request.method == "tasks/sendSubscribe":
+            # sessions/send streams a task's events over the session's
+            # subscriptions instead, and only acknowledges the call itself.
+            # Subscriptions are held per server process, so with several
+            # workers the caller may need to fall back to tasks/sendSubscribe.
+            if jsonrpc_request.method == "sessions/send":
                 params = TaskSendParams(**jsonrpc_request.params)
-                return EventSourceResponse(self.stream_task(params, jsonrpc_request.id))
+                if params.sessionId not in self._subscribers:
+                    return PydanticResponse(
+                        content=self.error_response(
+                            jsonrpc_request.id,
+                            -32602,
+                            "Invalid params",
+                            {"error": "Session has no subscription on this server", "sessionId": params.sessionId}
+                        ),
+                        status_code=400
+                    )
 
-            elif jsonrpc_request.method == "tasks/get":
-                params = TaskQueryParams(**jsonrpc_request.params)
-                result = self.get_task(params)
-                return JSONResponse(
+                self.publish_task(params, jsonrpc_request.id)
+                return PydanticResponse(
                     content=JSONRPCResponse(
                         jsonrpc="2.0",
                         id=jsonrpc_request.id,
-                        result=result
-                    ).dict(exclude_none=True)
+                        result=Task.model_construct(id=params.id, status=TaskStatus.model_construct(state="working"))
+                    )
                 )
 
-            elif jsonrpc_request.method == "tasks/cancel":
-                params = TaskIdParams(**jsonrpc_request.params)
-                result = self.cancel_task(params)
-                return JSONResponse(
-                    content=JSONRPCResponse(
-                        jsonrpc="2.0",
-                        id=jsonrpc_request.id,
-                        result=result
-                    ).dict(exclude_none=True)
+            result = await self.call_method(jsonrpc_request.method, jsonrpc_request.params)
+            return PydanticResponse(
+                content=JSONRPCResponse(
+                    jsonrpc="2.0",
+                    id=jsonrpc_request.id,
+                    result=result
                 )
+            )
 
-            else:
-                # Method not found
-                return JSONResponse(
-                    content=JSONRPCResponse(
-                        jsonrpc="2.0",
-                        id=jsonrpc_request.id,
-                        error=JSONRPCError(
-                            code=-32601,
-                            message="Method not found",
-                            data={"method": jsonrpc_request.method}
-                        ).dict(exclude_none=True)
-                    ).dict(exclude_none=True),
-                    status_code=404
-                )
+        except MethodNotFoundError as e:
+            # Method not found
+            return Response(
+                content=_envelope(jsonrpc_request.id) + _METHOD_NOT_FOUND_TEMPLATE % orjson.dumps(e.method),
+                media_type="application/json",
+                status_code=404
+            )
 
         except Exception as e:
-            # Capture exception with Sentry
-            error_id = capture_exception(e)
-
-            # Log error details
-            error_details = {
-                "error": str(e),
-                "traceback": traceback.format_exc(),
-                "error_id": error_id
-            }
-
-            # Set context for Sentry
-            set_context("request", {
-                "method": getattr(jsonrpc_request, "method", "unknown"),
-                "id": getattr(jsonrpc_request, "id", "unknown")
-            })
-
-            # Log error message
-            print(f"Error processing request: {str(e)}")
+            error_id = self.report_error(e, jsonrpc_request)
 
             # Internal error
-            return JSONResponse(
-                content=JSONRPCResponse(
-                    jsonrpc="2.0",
-                    id=getattr(jsonrpc_request, "id", None),
-                    error=JSONRPCError(
-                        code=-32603,
-                        message="Internal error",
-                        data={
-                            "error": str(e),
-                            "error_id": error_id
-                        }
-                    ).dict(exclude_none=True)
-                ).dict(exclude_none=True),
+            return Response(
+                content=_envelope(getattr(jsonrpc_request, "id", None))
+                + _INTERNAL_ERROR_TEMPLATE % (orjson.dumps(str(e)), orjson.dumps(error_id)),
+                media_type="application/json",
                 status_code=500
             )
 
+    async def handle_batch(self, batch: List[Any]) -> List[JSONRPCResponse]:
+        """Handle a JSON-RPC batch, running its calls concurrently."""
+        if not batch:
+            return [self.error_response(None, -32600, "Invalid Request")]
+        return list(await asyncio.gather(*(self.handle_batch_call(data) for data in batch)))
+
+    async def handle_batch_call(self, data: Any) -> JSONRPCResponse:
+        """Handle a single call from a JSON-RPC batch and return its response."""
+        jsonrpc_request = None
+        try:
+            jsonrpc_request = JSONRPCRequest(**data)
+            result = await self.call_method(jsonrpc_request.method, jsonrpc_request.params)
+        except MethodNotFoundError as e:
+            # Streaming methods can't be answered inside a batch either
+            return self.error_response(
+                jsonrpc_request.id, -32601, "Method not found", {"method": e.method}
+            )
+        except Exception as e:
+            error_id = self.report_error(e, jsonrpc_request)
+            return self.error_response(
+                getattr(jsonrpc_request, "id", None),
+                -32603,
+                "Internal error",
+                {"error": str(e), "error_id": error_id}
+            )
+
+        # Left as a model so it's serialized once, along with the whole batch
+        return JSONRPCResponse(
+            jsonrpc="2.0",
+            id=jsonrpc_request.id,
+            result=result
+        )
+
+    async def call_method(self, method: str, params: Any) -> Any:
+        """Run a non-streaming JSON-RPC method and return its result."""
+        entry = self._methods.get(method)
+        if entry is None:
+            raise MethodNotFoundError(method)
+
+        params_model, handler = entry
+        return await handler(params_model(**params) if params_model is not None else None)
+
+    async def agent_card_result(self, params: None) -> AgentCard:
+        """Handle agent/getCard."""
+        return self._agent_card
+
+    def agent_card_response(self, request_id: Any) -> Response:
+        """Build the agent/getCard response around the cached agent card JSON."""
+        return Response(
+            content=_envelope(request_id) + b'"result":' + self._agent_card_json + b'}',
+            media_type="application/json"
+        )
+
+    @staticmethod
+    def error_response(request_id: Any, code: int, message: str, data: Any = None) -> JSONRPCResponse:
+        """Build a JSON-RPC error response."""
+        # Left as a model, so the error is dumped along with the response it's in
+        return JSONRPCResponse(
+            jsonrpc="2.0",
+            id=request_id,
+            error=JSONRPCError(
+                code=code,
+                message=message,
+                data=data
+            )
+        )
+
+    @staticmethod
+    def report_error(e: Exception, jsonrpc_request: Optional[JSONRPCRequest]) -> str:
+        """Report an error to Sentry and return its error ID."""
+        # Capture exception with Sentry
+        error_id = capture_exception(e)
+
+        # Set context for Sentry
+        set_context("request", {
+            "method": getattr(jsonrpc_request, "method", "unknown"),
+            "id": getattr(jsonrpc_request, "id", "unknown")
+        })
+
+        # Log error message
+        print(f"Error processing request: {str(e)}")
+
+        return error_id
+
     def get_agent_card(self) -> AgentCard:
         """Get the agent card."""
+        return self._agent_card
+
+    @staticmethod
+    def _build_agent_card() -> AgentCard:
+        """Build the agent card from the environment."""
         return AgentCard(
             name=os.getenv("AGENT_NAME", "LangGraph A2A Agent"),
             description=os.getenv("AGENT_DESCRIPTION", "A demo implementation of an A2A agent using LangGraph"),
@@ -199,220 +437,304 @@ class A2AServer:
             ]
         )
 
-    def get_or_create_session(self, session_id: str) -> Dict[str, AgentState]:
-        """Get or create a session."""
-        if session_id not in sessions:
-            sessions[session_id] = {}
-        return sessions[session_id]
-
-    def get_or_create_task_state(self, session_id: str, task_id: str) -> AgentState:
+    async def get_or_create_task_state(self, session_id: str, task_id: str) -> AgentState:
         """Get or create a task state."""
-        session = self.get_or_create_session(session_id)
-        if task_id not in session:
-            session[task_id] = AgentState()
-        return session[task_id]
+        state = await self._store.get(session_id, task_id)
+        if state is None:
+            state = AgentState(context={"session_id": session_id})
+        return state
+
+    async def get_task_state(self, session_id: str, task_id: str) -> AgentState:
+        """Get an existing task state."""
+        state = await self._store.get(session_id, task_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return state
+
+    @staticmethod
+    def user_text(message: Message) -> str:
+        """Get the text of the first text part of a message."""
+        # Messages are almost always a single text part
+        parts = message.parts
+        if parts and parts[0].type == "text":
+            return parts[0].text
+        return next((part.text for part in parts if part.type == "text"), "")
+
+    def task_lock(self, session_id: str, task_id: str) -> asyncio.Lock:
+        """Get the lock serializing runs of a task."""
+        key = (session_id, task_id)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
 
     async def process_task(self, params: TaskSendParams) -> Task:
         """Process a task."""
-        # Get or create task state
-        state = self.get_or_create_task_state(params.sessionId, params.id)
+        async with self.task_lock(params.sessionId, params.id):
+            # Get or create task state
+            state = await self.get_or_create_task_state(params.sessionId, params.id)
 
-        # Add user message to state
-        user_content = next((part.text for part in params.message.parts if part.type == "text"), "")
-        state.add_user_message(user_content)
+            # Add user message to state
+            user_content = self.user_text(params.message)
+            state.add_user_message(user_content)
 
-        # Run the graph
-        result = await agent_graph.ainvoke(state)
+            # Run the graph
+            result = await self.run_graph(state)
+            await self._store.save(params.sessionId, params.id, result)
 
-        # Convert result to A2A Task
-        task = Task(
-            id=params.id,
-            status=TaskStatus(
-                state=result.task_state,
-                timestamp=datetime.now().isoformat()
-            ),
-            history=[]
-        )
+            # Convert result to A2A Task
+            return self.build_task(params.id, result, time.time())
 
+    @staticmethod
+    def build_task(task_id: str, state: AgentState, timestamp: float) -> Task:
+        """Build the A2A Task describing a task state.
+
+        Outbound models are built with model_construct, skipping validation,
+        since their values come from the server's own state.
+        """
         # If completed, add artifacts
-        if result.task_state == "completed" and result.final_response:
-            task.artifacts = [
-                Artifact(
-                    parts=[Part(type="text", text=result.final_response)],
+        artifacts = None
+        if state.task_state == "completed" and state.final_response:
+            artifacts = [
+                Artifact.model_construct(
+                    parts=[TextPart.model_construct(text=state.final_response)],
                     index=0
                 )
             ]
 
         # If input required, add message to status
-        if result.task_state == "input-required":
-            assistant_message = result.get_last_assistant_message()
+        message = None
+        if state.task_state == "input-required":
+            assistant_message = state.get_last_assistant_message()
             if assistant_message:
-                task.status.message = Message(
+                message = Message.model_construct(
                     role="agent",
-                    parts=[Part(type="text", text=assistant_message)]
+                    parts=[TextPart.model_construct(text=assistant_message)]
                 )
 
-        return task
+        return Task.model_construct(
+            id=task_id,
+            status=TaskStatus.model_construct(
+                state=state.task_state,
+                message=message,
+                timestamp=timestamp
+            ),
+            artifacts=artifacts
+        )
 
-    async def stream_task(self, params: TaskSendParams, request_id: Any) -> AsyncGenerator[str, None]:
+    async def stream_task(self, params: TaskSendParams, request_id: Any) -> AsyncGenerator[bytes, None]:
         """Stream a task."""
-        # Get or create task state
-        state = self.get_or_create_task_state(params.sessionId, params.id)
+        async with self.task_lock(params.sessionId, params.id):
+            # Get or create task state
+            state = await self.get_or_create_task_state(params.sessionId, params.id)
 
-        # Add user message to state
-        user_content = next((part.text for part in params.message.parts if part.type == "text"), "")
-        state.add_user_message(user_content)
+            # Add user message to state
+            user_content = self.user_text(params.message)
+            state.add_user_message(user_content)
 
-        # Initial working state
-        yield self.format_sse_event(JSONRPCResponse(
-            jsonrpc="2.0",
-            id=request_id,
-            result=Task(
-                id=params.id,
-                status=TaskStatus(
+            # Every frame shares the response envelope and task id, so encode them once
+            prefix = self.sse_prefix(request_id, params.id)
+
+            # Initial working state
+            yield self.sse_frame(prefix, {
+                "status": TaskStatus.model_construct(
                     state="working",
-                    message=Message(
+                    message=Message.model_construct(
                         role="agent",
-                        parts=[Part(type="text", text="Processing your request...")]
-                    ),
-                    timestamp=datetime.now().isoformat()
+                        parts=[TextPart.model_construct(text="Processing your request...")]
+                    )
                 ),
-                final=False
-            )
-        ).dict(exclude_none=True))
-
-        # Run the graph with streaming
-        async for intermediate_state in agent_graph.astream(state):
-            # Yield intermediate updates if available
-            if intermediate_state.intermediate_responses:
-                latest_response = intermediate_state.intermediate_responses[-1]
-                yield self.format_sse_event(JSONRPCResponse(
-                    jsonrpc="2.0",
-                    id=request_id,
-                    result=Task(
-                        id=params.id,
-                        status=TaskStatus(
+                "final": False
+            })
+
+            # Intermediate responses left from earlier runs of the task aren't sent again
+            sent = len(state.intermediate_responses)
+
+            # Run the graph with streaming, in its own task so it keeps making
+            # progress while frames are encoded and written to the client
+            updates: asyncio.Queue = asyncio.Queue()
+            producer = asyncio.create_task(self.run_graph(state, updates))
+            try:
+                last_response = None
+                while (intermediate_state := await updates.get()) is not None:
+                    # Yield new intermediate updates, skipping repeats of the last one
+                    responses = intermediate_state.intermediate_responses
+                    if len(responses) <= sent:
+                        continue
+                    sent = len(responses)
+                    latest_response = responses[-1]
+                    if latest_response == last_response:
+                        continue
+                    last_response = latest_response
+                    yield self.sse_frame(prefix, {
+                        "status": TaskStatus.model_construct(
                             state="working",
-                            message=Message(
+                            message=Message.model_construct(
                                 role="agent",
-                                parts=[Part(type="text", text=latest_response)]
-                            ),
-                            timestamp=datetime.now().isoformat()
+                                parts=[TextPart.model_construct(text=latest_response)]
+                            )
                         ),
-                        final=False
-                    )
-                ).dict(exclude_none=True))
-                await asyncio.sleep(0.5)  # Add a small delay for better streaming experience
-
-        # Get final state
-        final_state = sessions[params.sessionId][params.id]
-
-        # If completed, yield artifact
-        if final_state.task_state == "completed" and final_state.final_response:
-            yield self.format_sse_event(JSONRPCResponse(
-                jsonrpc="2.0",
-                id=request_id,
-                result=Task(
-                    id=params.id,
-                    artifact=Artifact(
-                        parts=[Part(type="text", text=final_state.final_response)],
+                        "final": False
+                    })
+                    if SSE_MIN_INTERVAL > 0:
+                        await asyncio.sleep(SSE_MIN_INTERVAL)
+
+                # The graph builds new states rather than updating the one
+                # passed in, so keep the one it ended in. This also re-raises
+                # anything the graph run failed with.
+                final_state = await producer
+            finally:
+                # Stop the graph if the client went away mid-stream
+                producer.cancel()
+
+            await self._store.save(params.sessionId, params.id, final_state)
+
+            # If completed, yield artifact
+            if final_state.task_state == "completed" and final_state.final_response:
+                yield self.sse_frame(prefix, {
+                    "artifact": Artifact.model_construct(
+                        parts=[TextPart.model_construct(text=final_state.final_response)],
                         index=0,
                         append=False
                     )
-                )
-            ).dict(exclude_none=True))
+                })
+
+            # Yield final completion, with the agent's question if it needs more input
+            final_message = None
+            if final_state.task_state == "input-required":
+                assistant_message = final_state.get_last_assistant_message()
+                if assistant_message:
+                    final_message = Message.model_construct(
+                        role="agent",
+                        parts=[TextPart.model_construct(text=assistant_message)]
+                    )
 
-        # Yield final completion
-        yield self.format_sse_event(JSONRPCResponse(
-            jsonrpc="2.0",
-            id=request_id,
-            result=Task(
-                id=params.id,
-                status=TaskStatus(
+            yield self.sse_frame(prefix, {
+                "status": TaskStatus.model_construct(
                     state=final_state.task_state,
-                    timestamp=datetime.now().isoformat()
+                    message=final_message
                 ),
-                final=True
-            )
-        ).dict(exclude_none=True))
+                "final": True
+            })
 
-    def get_task(self, params: TaskQueryParams) -> Task:
-        """Get a task."""
-        # Check if session exists
-        if params.sessionId not in sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
+    @staticmethod
+    async def run_graph(state: AgentState, updates: Optional[asyncio.Queue] = None) -> AgentState:
+        """Run the graph over a task state and return the state it ended in.
 
-        # Check if task exists
-        if params.id not in sessions[params.sessionId]:
-            raise HTTPException(status_code=404, detail="Task not found")
+        If a queue is given, each state the graph passes through is put on
+        it, followed by None.
+        """
+        final_state = state
+        try:
+            # Each value is the full state after a step, as a dict of fields
+            async for values in agent_graph.astream(state, stream_mode="values"):
+                final_state = AgentState(**values)
+                if updates is not None:
+                    updates.put_nowait(final_state)
+            return final_state
+        finally:
+            # A tool call started ahead of a node that never ran, because the
+            # run failed or was cancelled, must not outlive the run
+            pending, final_state.pending_tool_call = final_state.pending_tool_call, None
+            if pending is not None:
+                if not pending.done():
+                    pending.cancel()
+                elif not pending.cancelled():
+                    # Mark its outcome as retrieved
+                    pending.exception()
+            if updates is not None:
+                updates.put_nowait(None)
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Register a new subscription to a session and return its event queue."""
+        events: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(session_id, set()).add(events)
+        return events
+
+    async def session_events(self, session_id: str, events: asyncio.Queue) -> AsyncGenerator[bytes, None]:
+        """Stream the events published to a session subscription until the client disconnects."""
+        try:
+            while True:
+                yield await events.get()
+        finally:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is not None:
+                subscribers.discard(events)
+                if not subscribers:
+                    del self._subscribers[session_id]
+
+    def publish_task(self, params: TaskSendParams, request_id: Any) -> None:
+        """Stream a task in the background, sending its events to the session's subscribers."""
+        def send(event: bytes) -> None:
+            for events in self._subscribers.get(params.sessionId, ()):
+                events.put_nowait(event)
+
+        async def publish() -> None:
+            try:
+                async for event in self.stream_task(params, request_id):
+                    send(event)
+            except Exception as e:
+                error_id = self.report_error(e, None)
+
+                # Subscribers wait for a final event, so end the task with one
+                send(self.sse_frame(self.sse_prefix(request_id, params.id), {
+                    "status": TaskStatus.model_construct(
+                        state="failed",
+                        message=Message.model_construct(
+                            role="agent",
+                            parts=[TextPart.model_construct(text=f"Internal error: {e} ({error_id})")]
+                        )
+                    ),
+                    "final": True
+                }))
+
+        task = asyncio.create_task(publish())
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
 
+    async def get_task(self, params: TaskQueryParams) -> Task:
+        """Get a task."""
         # Get task state
-        state = sessions[params.sessionId][params.id]
+        state = await self.get_task_state(params.sessionId, params.id)
 
         # Convert state to A2A Task
-        task = Task(
-            id=params.id,
-            status=TaskStatus(
-                state=state.task_state,
-                timestamp=state.last_updated
-            ),
-            history=[]
-        )
-
-        # If completed, add artifacts
-        if state.task_state == "completed" and state.final_response:
-            task.artifacts = [
-                Artifact(
-                    parts=[Part(type="text", text=state.final_response)],
-                    index=0
-                )
-            ]
-
-        # If input required, add message to status
-        if state.task_state == "input-required":
-            assistant_message = state.get_last_assistant_message()
-            if assistant_message:
-                task.status.message = Message(
-                    role="agent",
-                    parts=[Part(type="text", text=assistant_message)]
-                )
-
-        return task
+        return self.build_task(params.id, state, state.last_updated)
 
-    def cancel_task(self, params: TaskIdParams) -> Task:
+    async def cancel_task(self, params: TaskIdParams) -> Task:
         """Cancel a task."""
-        # Check if session exists
-        if params.sessionId not in sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        # Check if task exists
-        if params.id not in sessions[params.sessionId]:
-            raise HTTPException(status_code=404, detail="Task not found")
-
         # Get task state
-        state = sessions[params.sessionId][params.id]
+        state = await self.get_task_state(params.sessionId, params.id)
 
         # Update task state
         state.task_state = "canceled"
-        state.last_updated = datetime.now().isoformat()
+        state.touch()
+        await self._store.save(params.sessionId, params.id, state)
 
         # Convert state to A2A Task
-        task = Task(
+        task = Task.model_construct(
             id=params.id,
-            status=TaskStatus(
+            status=TaskStatus.model_construct(
                 state="canceled",
                 timestamp=state.last_updated
-            ),
-            history=[]
+            )
         )
 
         return task
 
     @staticmethod
-    def format_sse_event(data: Any) -> str:
-        """Format data for SSE."""
-        if isinstance(data, dict):
-            json_data = json.dumps(data)
-        else:
-            json_data = json.dumps(data, default=lambda o: o.dict() if hasattr(o, "dict") else str(o))
-        return f"data: {json_data}\n\n"
+    def sse_response(frames: AsyncGenerator[bytes, None]) -> EventSourceResponse:
+        """Build an event stream response for a generator of encoded SSE frames."""
+        if SSE_FLUSH_MS > 0:
+            frames = coalesce_frames(frames, SSE_FLUSH_MS / 1000)
+        return EventSourceResponse(frames, ping=SSE_PING_INTERVAL)
+
+    @staticmethod
+    def sse_prefix(request_id: Any, task_id: str) -> bytes:
+        """Encode the start of a streamed response, up to and including the task id."""
+        return _envelope(request_id) + b'"result":{"id":' + orjson.dumps(task_id) + b','
+
+    @staticmethod
+    def sse_frame(prefix: bytes, fields: Dict[str, Any]) -> bytes:
+        """Format an SSE event from a prefix and the remaining fields of its task."""
+        # Drop the opening brace of the encoded fields; the prefix already opened the task
+        return b"data: " + prefix + orjson.dumps(fields, default=_encode_model)[1:] + b"}\n\n"
@@ -19,7 +19,17 @@ if __name__ == "__main__":
     # Get server configuration
     host = os.getenv("SERVER_HOST", "localhost")
     port = int(os.getenv("SERVER_PORT", "10000"))
+    workers = int(os.getenv("SERVER_WORKERS", "1"))
     
-    # Start server
+    # Start server. uvicorn[standard] provides uvloop and httptools, which the
+    # default "auto" loop and HTTP settings pick up where they're available.
+    # Multiple workers need an import string so each can load its own app,
+    # and REDIS_URL set so they share task state.
     print(f"Starting A2A server at http://{host}:{port}")
-    uvicorn.run(app, host=host, port=port)
+    uvicorn.run(
+        app if workers == 1 else "src.server.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        log_level="warning"
+    )
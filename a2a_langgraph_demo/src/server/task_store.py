@@ -0,0 +1,104 @@
+"""
+Storage for agent task states.
+"""
+
+from typing import Optional
+
+import orjson
+from cachetools import TTLCache
+
+from ..agent.state import AgentState, Message
+
+
+class MemoryTaskStore:
+    """Task states held in this process, evicted by age and count."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        """Initialize the store."""
+        self._tasks: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, session_id: str, task_id: str) -> Optional[AgentState]:
+        """Get a task state, or None if there isn't one."""
+        return self._tasks.get((session_id, task_id))
+
+    async def save(self, session_id: str, task_id: str, state: AgentState) -> None:
+        """Store a task state, restarting its time to live."""
+        self._tasks[(session_id, task_id)] = state
+
+
+def dump_state(state: AgentState) -> bytes:
+    """Encode a task state as JSON.
+
+    The LangChain copies of the messages and any in-flight tool call are
+    left out; the former are rebuilt on load and the latter belongs to the
+    process running it.
+    """
+    return orjson.dumps({
+        "messages": [[message.role, message.content] for message in state.messages],
+        "parameters": state.parameters,
+        "task_state": state.task_state,
+        "context": state.context,
+        "last_updated": state.last_updated,
+        "final_response": state.final_response,
+        "intermediate_responses": state.intermediate_responses,
+        "error": state.error,
+    })
+
+
+def load_state(raw: bytes) -> AgentState:
+    """Decode a task state encoded by dump_state."""
+    data = orjson.loads(raw)
+    state = AgentState(
+        parameters=data["parameters"],
+        task_state=data["task_state"],
+        context=data["context"],
+        final_response=data["final_response"],
+        intermediate_responses=data["intermediate_responses"],
+        error=data["error"],
+    )
+
+    # Replaying the messages also rebuilds the LangChain messages and the
+    # positions of the latest user and assistant messages
+    for role, content in data["messages"]:
+        if role == "user":
+            state.add_user_message(content)
+        elif role == "assistant":
+            state.add_assistant_message(content)
+        else:
+            state.messages.append(Message(role=role, content=content))
+
+    state.last_updated = data["last_updated"]
+    return state
+
+
+class RedisTaskStore:
+    """Task states kept in Redis, so every server worker sees the same tasks.
+
+    States are stored as JSON rather than pickled, so write access to Redis
+    doesn't amount to running code in the workers.
+
+    Runs of a task are serialized by a lock in the process running them, so
+    two workers can still interleave runs of the same task; the last one to
+    finish overwrites the other's update.
+    """
+
+    def __init__(self, url: str, ttl: int):
+        """Initialize the store."""
+        # Only needed when Redis is configured
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str, task_id: str) -> str:
+        return f"a2a:{session_id}:{task_id}"
+
+    async def get(self, session_id: str, task_id: str) -> Optional[AgentState]:
+        """Get a task state, or None if there isn't one."""
+        raw = await self._redis.get(self._key(session_id, task_id))
+        return load_state(raw) if raw is not None else None
+
+    async def save(self, session_id: str, task_id: str, state: AgentState) -> None:
+        """Store a task state, restarting its time to live."""
+        await self._redis.set(self._key(session_id, task_id), dump_state(state), ex=self.ttl)
@@ -0,0 +1,29 @@
+"""
+Timestamp helpers.
+"""
+
+import time
+from datetime import datetime
+
+# (epoch second, ISO string) for the last formatted second, swapped as one
+# tuple so threads never see a mismatched pair
+_last = (-1, "")
+
+
+def iso_format(timestamp: float) -> str:
+    """
+    Format an epoch timestamp as a local ISO 8601 string with one-second resolution.
+    
+    The last formatted string is reused for timestamps in the same second,
+    so frequent callers skip the datetime construction and formatting.
+    """
+    global _last
+    second = int(timestamp)
+    if second != _last[0]:
+        _last = (second, datetime.fromtimestamp(second).isoformat())
+    return _last[1]
+
+
+def iso_now() -> str:
+    """Get the current local time as an ISO 8601 string with one-second resolution."""
+    return iso_format(time.time())
@@ -0,0 +1,13 @@
+"""
+Shared test setup.
+"""
+
+import os
+import sys
+
+# The agent creates its LLM client at import. The tests never reach the
+# LLM, so any key will do.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+# Import the package from this checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
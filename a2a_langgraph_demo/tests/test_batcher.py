@@ -0,0 +1,88 @@
+"""
+Tests for the LLM request batcher.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from src.agent.batcher import LLMBatcher
+
+
+class FakeChain:
+    """Runnable stand-in recording the inputs of each call."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    async def ainvoke(self, inputs):
+        self.calls.append(inputs)
+        return self.reply(inputs)
+
+    async def abatch(self, inputs_list):
+        return [await self.ainvoke(inputs) for inputs in inputs_list]
+
+
+def make_batcher(batch_reply=None):
+    chain = FakeChain(lambda inputs: inputs["input"].upper())
+    batch_chain = FakeChain(batch_reply or (
+        lambda inputs: SimpleNamespace(results=[line.split(". ", 1)[1].upper() for line in inputs["inputs"].splitlines()])
+    ))
+    return LLMBatcher(chain=chain, batch_chain=batch_chain), chain, batch_chain
+
+
+def test_same_key_requests_share_one_call():
+    batcher, chain, batch_chain = make_batcher()
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(text, "session") for text in ("a", "b", "c")))
+
+    assert asyncio.run(run()) == ["A", "B", "C"]
+    assert batch_chain.calls == [{"inputs": "1. a\n2. b\n3. c"}]
+    assert chain.calls == []
+
+
+def test_requests_are_not_batched_across_keys():
+    batcher, chain, batch_chain = make_batcher()
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit("a", "one"), batcher.submit("b", "two"), batcher.submit("c")
+        )
+
+    assert asyncio.run(run()) == ["A", "B", "C"]
+    assert batch_chain.calls == []
+    assert sorted(call["input"] for call in chain.calls) == ["a", "b", "c"]
+
+
+def test_incomplete_batch_reply_falls_back_to_single_calls():
+    batcher, chain, batch_chain = make_batcher(lambda inputs: SimpleNamespace(results=["only one"]))
+
+    async def run():
+        return await asyncio.gather(batcher.submit("a", "session"), batcher.submit("b", "session"))
+
+    assert asyncio.run(run()) == ["A", "B"]
+    assert len(batch_chain.calls) == 1
+    assert [call["input"] for call in chain.calls] == ["a", "b"]
+
+
+def test_errors_reach_every_request_in_the_batch():
+    def fail(inputs):
+        raise RuntimeError("LLM unavailable")
+
+    batcher, chain, batch_chain = make_batcher(fail)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit("a", "session"), batcher.submit("b", "session"), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert [str(result) for result in results] == ["LLM unavailable", "LLM unavailable"]
+
+
+def test_batcher_works_across_event_loops():
+    batcher, chain, batch_chain = make_batcher()
+
+    assert asyncio.run(batcher.submit("a", "session")) == "A"
+    assert asyncio.run(batcher.submit("b", "session")) == "B"
@@ -0,0 +1,32 @@
+"""
+Tests for the agent graph.
+"""
+
+import pytest
+
+from src.agent.graph import fast_parse
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Convert 100 USD to EUR", {
+        "task_type": "currency_conversion", "amount": 100.0, "from_currency": "USD", "to_currency": "EUR"
+    }),
+    ("  convert 12.5 gbp into jpy? ", {
+        "task_type": "currency_conversion", "amount": 12.5, "from_currency": "GBP", "to_currency": "JPY"
+    }),
+    ("What's the weather like in London?", {"task_type": "weather_information", "location": "London"}),
+    ("weather in New York", {"task_type": "weather_information", "location": "New York"}),
+])
+def test_fast_parse_matches_common_phrasings(text, expected):
+    assert fast_parse(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "How much is 50 GBP in JPY?",
+    "Weather forecast for New York tomorrow",
+    "What's the weather in Paris tomorrow?",
+    "Convert 100 dollars to euros",
+    "Hello",
+])
+def test_fast_parse_leaves_other_queries_to_the_llm(text):
+    assert fast_parse(text) is None
@@ -0,0 +1,193 @@
+"""
+Tests for the A2A server.
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.agent.state import AgentState
+from src.server.a2a_models import TaskSendParams
+from src.server.a2a_server import A2AServer
+
+
+@pytest.fixture
+def client():
+    return TestClient(A2AServer().app)
+
+
+def test_batch_answers_each_call_in_order(client):
+    response = client.post("/", json=[
+        {"jsonrpc": "2.0", "id": 1, "method": "agent/getCard", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "tasks/unknown", "params": {}},
+        {"jsonrpc": "2.0", "id": 3, "method": "tasks/get", "params": {"id": "missing", "sessionId": "s"}},
+    ])
+
+    assert response.status_code == 200
+    card, unknown, missing = response.json()
+    assert card["id"] == 1
+    assert card["result"]["name"]
+    assert unknown == {
+        "jsonrpc": "2.0",
+        "id": 2,
+        "error": {"code": -32601, "message": "Method not found", "data": {"method": "tasks/unknown"}},
+    }
+    assert missing["id"] == 3
+    assert missing["error"]["code"] == -32603
+    assert "result" not in missing
+
+
+def test_empty_batch_is_an_invalid_request(client):
+    response = client.post("/", json=[])
+
+    assert response.json() == [
+        {"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}}
+    ]
+
+
+def send_params(text, task_id="task-1", session_id="session-1"):
+    return {
+        "id": task_id,
+        "sessionId": session_id,
+        "message": {"role": "user", "parts": [{"type": "text", "text": text}]},
+    }
+
+
+def test_send_runs_the_task_to_completion(client):
+    response = client.post("/", json={
+        "jsonrpc": "2.0", "id": 1, "method": "tasks/send", "params": send_params("Convert 100 USD to EUR")
+    })
+
+    assert response.status_code == 200
+    task = response.json()["result"]
+    assert task["id"] == "task-1"
+    assert task["status"]["state"] == "completed"
+    assert "EUR" in task["artifacts"][0]["parts"][0]["text"]
+
+
+def stream_events(client, params, method="tasks/sendSubscribe"):
+    """Post a streaming call and return the JSON-RPC responses of its events."""
+    events = []
+    with client.stream("POST", "/", json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params}) as response:
+        assert response.status_code == 200
+        for line in response.iter_lines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: "):]))
+    return events
+
+
+def test_send_subscribe_streams_the_task_to_completion(client):
+    events = stream_events(client, send_params("Convert 100 USD to EUR"))
+
+    assert all(event["id"] == 1 and event["result"]["id"] == "task-1" for event in events)
+    results = [event["result"] for event in events]
+    assert results[0]["status"]["state"] == "working"
+    assert results[0]["final"] is False
+    assert any("artifact" in result and "EUR" in result["artifact"]["parts"][0]["text"] for result in results)
+    assert results[-1]["status"]["state"] == "completed"
+    assert results[-1]["final"] is True
+
+    # Each intermediate response is sent once
+    updates = [result["status"]["message"]["parts"][0]["text"] for result in results if result.get("final") is False]
+    assert len(updates) == len(set(updates))
+
+
+def get_task(client, task_id="task-1", session_id="session-1"):
+    response = client.post("/", json={
+        "jsonrpc": "2.0", "id": 2, "method": "tasks/get", "params": {"id": task_id, "sessionId": session_id}
+    })
+    return response.json()["result"]
+
+
+def test_get_reports_the_state_a_send_ended_in(client):
+    client.post("/", json={
+        "jsonrpc": "2.0", "id": 1, "method": "tasks/send", "params": send_params("Convert 100 USD to EUR")
+    })
+
+    task = get_task(client)
+    assert task["status"]["state"] == "completed"
+    assert "EUR" in task["artifacts"][0]["parts"][0]["text"]
+
+
+def test_get_reports_the_state_a_stream_ended_in(client):
+    stream_events(client, send_params("What's the weather like in London?"))
+
+    task = get_task(client)
+    assert task["status"]["state"] == "completed"
+    assert "London" in task["artifacts"][0]["parts"][0]["text"]
+
+
+def test_session_send_without_a_subscription_is_rejected(client):
+    response = client.post("/", json={
+        "jsonrpc": "2.0", "id": 1, "method": "sessions/send", "params": send_params("Convert 100 USD to EUR")
+    })
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == -32602
+
+
+def test_failed_session_task_ends_with_a_final_failed_event(monkeypatch):
+    server = A2AServer()
+
+    async def fail(params, request_id):
+        raise RuntimeError("graph failed")
+        yield
+
+    monkeypatch.setattr(server, "stream_task", fail)
+
+    async def run():
+        events = server.subscribe("session-1")
+        server.publish_task(TaskSendParams(**send_params("Convert 100 USD to EUR")), 1)
+        return await asyncio.wait_for(events.get(), 1)
+
+    frame = asyncio.run(run())
+    result = json.loads(frame[len(b"data: "):])["result"]
+    assert result["id"] == "task-1"
+    assert result["status"]["state"] == "failed"
+    assert result["final"] is True
+
+
+def test_gzip_requests_are_decompressed(client):
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "agent/getCard", "params": {}}).encode()
+    response = client.post("/", content=gzip.compress(body), headers={"Content-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.json()["result"]["name"]
+
+
+def test_gzip_requests_that_expand_too_far_are_rejected(client):
+    body = b'{"jsonrpc": "2.0", "id": 1, "method": "agent/getCard", "params": {}}' + b" " * (2 * 1024 * 1024)
+    response = client.post("/", content=gzip.compress(body), headers={"Content-Encoding": "gzip"})
+
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == -32600
+
+
+def parse_frame(frame):
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    return json.loads(frame[len(b"data: "):])
+
+
+def test_sse_frames_encode_complete_responses():
+    prefix = A2AServer.sse_prefix(7, 'task "1"')
+    frame = A2AServer.sse_frame(prefix, {"status": {"state": "working"}, "final": False})
+
+    assert parse_frame(frame) == {
+        "jsonrpc": "2.0",
+        "id": 7,
+        "result": {"id": 'task "1"', "status": {"state": "working"}, "final": False},
+    }
+
+
+def test_sse_frames_serialize_models_and_omit_a_missing_id():
+    task = A2AServer.build_task("task-1", AgentState(task_state="completed", final_response="done"), 0)
+    frame = A2AServer.sse_frame(A2AServer.sse_prefix(None, "task-1"), {"status": task.status, "final": True})
+
+    response = parse_frame(frame)
+    assert "id" not in response
+    assert response["result"]["id"] == "task-1"
+    assert response["result"]["status"]["state"] == "completed"
+    assert response["result"]["final"] is True
@@ -0,0 +1,90 @@
+"""
+Tests for the task state stores.
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from src.agent.state import AgentState
+from src.server.task_store import MemoryTaskStore, RedisTaskStore, dump_state, load_state
+
+
+def make_state():
+    state = AgentState(context={"session_id": "session-1"})
+    state.add_user_message("Convert 100 USD to EUR")
+    state.parameters.update({"task_type": "currency_conversion", "amount": 100.0})
+    state.add_intermediate_response("Analyzing your request...")
+    state.add_assistant_message("100 USD is 92 EUR")
+    state.set_final_response("100 USD is 92 EUR")
+    state.task_state = "completed"
+    return state
+
+
+def test_memory_store_returns_saved_states():
+    store = MemoryTaskStore(maxsize=10, ttl=60)
+    state = make_state()
+
+    async def run():
+        missing = await store.get("session-1", "task-1")
+        await store.save("session-1", "task-1", state)
+        return missing, await store.get("session-1", "task-1"), await store.get("session-2", "task-1")
+
+    missing, saved, other_session = asyncio.run(run())
+    assert missing is None
+    assert saved is state
+    assert other_session is None
+
+
+def test_memory_store_evicts_beyond_its_size():
+    store = MemoryTaskStore(maxsize=2, ttl=60)
+
+    async def run():
+        for task_id in ("task-1", "task-2", "task-3"):
+            await store.save("session-1", task_id, AgentState())
+        return [await store.get("session-1", task_id) is not None for task_id in ("task-1", "task-2", "task-3")]
+
+    assert asyncio.run(run()) == [False, True, True]
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def test_state_round_trips_through_json():
+    state = make_state()
+    loaded = load_state(dump_state(state))
+
+    assert loaded == state
+    assert loaded.get_last_user_message() == "Convert 100 USD to EUR"
+    assert loaded.get_last_assistant_message() == "100 USD is 92 EUR"
+    assert [message.content for message in loaded.lc_messages] == ["Convert 100 USD to EUR", "100 USD is 92 EUR"]
+    assert loaded.pending_tool_call is None
+
+
+def test_redis_store_saves_states_as_json(monkeypatch):
+    redis = pytest.importorskip("redis.asyncio")
+    fake = FakeRedis()
+    monkeypatch.setattr(redis, "from_url", lambda url: fake)
+    store = RedisTaskStore("redis://localhost", ttl=60)
+    state = make_state()
+
+    async def run():
+        missing = await store.get("session-1", "task-1")
+        await store.save("session-1", "task-1", state)
+        return missing, await store.get("session-1", "task-1")
+
+    missing, saved = asyncio.run(run())
+    assert missing is None
+    assert saved == state
+    assert orjson.loads(fake.values["a2a:session-1:task-1"])["task_state"] == "completed"